@@ -0,0 +1,184 @@
+"""
+Headless batch renderer for overnight backfills.
+Reads a JSONL manifest (one movie per line with title, genre, style,
+description and numScenes) and renders every movie with the same script,
+image and video logic as the web app, without HTTP or sessions. Models stay
+resident across movies, scene images are batched across movies, and the
+finished movies land in the normal history (data/movies.json).
+
+Usage:
+    python batch_render.py manifest.jsonl --preset final --report results.jsonl
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import app as web
+from inference_ipc import QueueFull, RenderCancelled
+
+BATCH_USER = 'batch'
+# Give up on a movie when the GPU queue stays full for this long (seconds)
+BATCH_QUEUE_MAX_WAIT = float(os.getenv('BATCH_QUEUE_MAX_WAIT', '3600'))
+
+
+def wait_for_gpu(call, *args, **kwargs):
+    """call(*args, **kwargs), retried every QUEUE_RETRY_AFTER seconds while the GPU queue is full"""
+    deadline = time.time() + BATCH_QUEUE_MAX_WAIT
+    while True:
+        try:
+            return call(*args, **kwargs)
+        except QueueFull as e:
+            if time.time() + web.QUEUE_RETRY_AFTER > deadline:
+                raise
+            print(f"⏳ {e}; retrying in {web.QUEUE_RETRY_AFTER}s")
+            time.sleep(web.QUEUE_RETRY_AFTER)
+
+
+def load_manifest(path):
+    """Movie entries from a JSONL manifest; blank lines and '#' comments are skipped"""
+    entries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError as e:
+                print(f"⚠️ Skipping manifest line {line_number}: {e}")
+                continue
+            entries.append({
+                'line': line_number,
+                'movie_data': {
+                    'title': data.get('title', 'Untitled Movie'),
+                    'genre': data.get('genre', 'Action'),
+                    'description': data.get('description', ''),
+                    'style': data.get('style', 'Cinematic'),
+                    'numScenes': str(data.get('numScenes', '5'))
+                }
+            })
+    return entries
+
+
+def write_script(entry):
+    """Generate the scenes of one manifest entry (runs on a worker thread)"""
+    genai_client = web.get_genai_client()
+    if not genai_client:
+        raise RuntimeError('Gemini API client not initialized')
+    movie_data = entry['movie_data']
+    return web.generate_script_scenes(genai_client, movie_data)[1]
+
+
+def render_scene_images(movies, batch_size=None):
+    """Render the scene images of several movies in shared SDXL batches"""
+    prompts, negative_prompts, image_paths, owners = [], [], [], []
+    for movie in movies:
+        movie['images'] = []
+        movie_data = movie['movie_data']
+        for scene in movie['scenes']:
+            prompt, negative_prompt = web.build_image_prompts(scene['content'], movie_data['genre'], movie_data['style'])
+            image_filename = f"scene_{scene['id']}_{uuid.uuid4().hex[:8]}.jpg"
+            prompts.append(prompt)
+            negative_prompts.append(negative_prompt)
+            image_paths.append(f"{web.app.config['OUTPUT_FOLDER']}/{image_filename}")
+            owners.append(movie)
+            movie['images'].append(f"/static/output/{image_filename}")
+
+    if not prompts:
+        return
+    print(f"🎨 Rendering {len(prompts)} scene images for {len(movies)} movies...")
+    wait_for_gpu(
+        web.get_inference().generate_scene_images,
+        prompts, negative_prompts, image_paths, user=BATCH_USER, batch_size=batch_size
+    )
+
+
+def render_chunk(movies, preset, batch_size, report):
+    """Images for the whole chunk first, then one video per movie"""
+    pending = [m for m in movies if m.get('scenes') and not m.get('error')]
+    try:
+        render_scene_images(pending, batch_size)
+    except Exception as e:
+        # Queue still full, cancelled or failed: only this chunk's movies fail
+        print(f"❌ Scene images failed for {len(pending)} movies: {e}")
+        for movie in pending:
+            movie['error'] = f"Scene images failed: {e}"
+
+    for movie in movies:
+        result = {'line': movie['line'], 'title': movie['movie_data']['title']}
+        if movie.get('error'):
+            result.update(status='failed', error=movie['error'])
+        else:
+            started = time.time()
+            try:
+                record = wait_for_gpu(
+                    web.render_movie,
+                    movie['images'], movie['movie_data'], movie['scenes'], preset, user=BATCH_USER
+                )
+                if record:
+                    result.update(status='completed', movie_id=record['id'], video_url=record['video_url'])
+                else:
+                    result.update(status='failed', error='No clips were created')
+            except RenderCancelled as e:
+                result.update(status='cancelled', error=str(e))
+            except QueueFull as e:
+                result.update(status='failed', error=f"GPU queue stayed full: {e}")
+            except Exception as e:
+                result.update(status='failed', error=str(e))
+            result['seconds'] = round(time.time() - started, 1)
+
+        print(f"{'✅' if result['status'] == 'completed' else '❌'} [{result['line']}] {result['title']}: {result['status']}")
+        report.write(json.dumps(result, ensure_ascii=False) + '\n')
+        report.flush()
+        yield result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render movies from a JSONL manifest without the web UI')
+    parser.add_argument('manifest', help='JSONL file with title/genre/style/description/numScenes per line')
+    parser.add_argument('--preset', default=None, help='Render preset (default: DEFAULT_RENDER_PRESET)')
+    parser.add_argument('--chunk', type=int, default=8, help='Movies whose images are batched together')
+    parser.add_argument('--image-batch-size', type=int, default=None, help='Images per SDXL call (default: IMAGE_BATCH_SIZE)')
+    parser.add_argument('--script-workers', type=int, default=4, help='Concurrent Gemini script requests')
+    parser.add_argument('--report', default=None, help='Write one JSON result per movie to this file')
+    args = parser.parse_args()
+
+    entries = load_manifest(args.manifest)
+    if not entries:
+        print("❌ Manifest has no movies")
+        return 1
+    print(f"🎬 BATCH RENDER: {len(entries)} movies from {args.manifest}")
+
+    report = open(args.report, 'a', encoding='utf-8') if args.report else open(os.devnull, 'w')
+    started = time.time()
+    completed = 0
+
+    # Scripts are network-bound, so they are requested ahead while the GPU renders
+    with ThreadPoolExecutor(max_workers=args.script_workers, thread_name_prefix='script') as scripts, report:
+        futures = [scripts.submit(write_script, entry) for entry in entries]
+        for start in range(0, len(entries), args.chunk):
+            movies = []
+            for entry, future in zip(entries[start:start + args.chunk], futures[start:start + args.chunk]):
+                movie = dict(entry)
+                try:
+                    movie['scenes'] = future.result()
+                except Exception as e:
+                    print(f"❌ Script generation failed for '{entry['movie_data']['title']}': {e}")
+                    movie['error'] = f"Script generation failed: {e}"
+                movies.append(movie)
+
+            for result in render_chunk(movies, args.preset, args.image_batch_size, report):
+                completed += result['status'] == 'completed'
+
+    elapsed = time.time() - started
+    print(f"🎉 BATCH COMPLETE: {completed}/{len(entries)} movies rendered in {elapsed / 60:.1f} min")
+    return 0 if completed == len(entries) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
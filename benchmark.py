@@ -0,0 +1,320 @@
+"""
+Offline benchmark for the AI Movie Generator.
+Runs the real Flask routes and render stages against the deterministic fake
+backends in fake_backends.py (no GPU, model weights or Gemini key needed),
+inside a throwaway working directory, and writes a JSON report that can be
+diffed between versions.
+
+Usage:
+    python benchmark.py --output benchmark_report.json
+    python benchmark.py --baseline old_report.json --wan-step-latency 0.02
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(latencies, elapsed=None, errors=0):
+    """Latency percentiles (ms) and throughput for a list of durations in seconds"""
+    elapsed = elapsed if elapsed is not None else sum(latencies)
+    return {
+        'count': len(latencies),
+        'errors': errors,
+        'mean_ms': round(1000 * sum(latencies) / len(latencies), 2) if latencies else None,
+        'p50_ms': round(1000 * percentile(latencies, 50), 2) if latencies else None,
+        'p95_ms': round(1000 * percentile(latencies, 95), 2) if latencies else None,
+        'p99_ms': round(1000 * percentile(latencies, 99), 2) if latencies else None,
+        'max_ms': round(1000 * max(latencies), 2) if latencies else None,
+        'throughput_per_s': round(len(latencies) / elapsed, 3) if elapsed else None
+    }
+
+
+def measure(fn, repeat):
+    """Call fn repeat times, returns (summary, last result); failures count as errors"""
+    latencies = []
+    errors = 0
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as e:
+            errors += 1
+            print(f"⚠️ Benchmark call failed: {e}", file=sys.__stdout__)
+            continue
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies, errors=errors), result
+
+
+def post_json(client, url, payload, expected=200):
+    response = client.post(url, json=payload)
+    if response.status_code != expected:
+        raise RuntimeError(f"{url} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return response.get_json()
+
+
+def bench_routes(web, args):
+    """End-to-end latency of the creation routes through the Flask test client"""
+    client = web.app.test_client()
+    results = {}
+    movie = {
+        'title': 'Benchmark Movie',
+        'genre': 'Sci-Fi',
+        'style': 'Cinematic',
+        'description': 'A deterministic benchmark story',
+        'numScenes': str(args.scenes)
+    }
+
+    results['/generate_script'], script = measure(
+        lambda: post_json(client, '/generate_script', movie), args.requests
+    )
+    scenes = script['scenes'] if script else []
+
+    image_paths = []
+
+    def generate_image():
+        scene = scenes[len(image_paths) % len(scenes)]
+        data = post_json(client, '/generate_image', {
+            'scene_id': scene['id'],
+            'scene_content': scene['content'],
+            'genre': movie['genre'],
+            'style': movie['style']
+        })
+        image_paths.append(data['image_path'])
+        return data
+
+    results['/generate_image'], _ = measure(generate_image, args.requests)
+
+    images = (image_paths * args.scenes)[:args.scenes]
+    results['/generate_video'], _ = measure(
+        lambda: post_json(client, '/generate_video', {'images': images, 'preset': args.preset}),
+        args.video_requests
+    )
+    return results, images
+
+
+def bench_stages(inference, web, images, args):
+    """Per-stage throughput of the render path, called directly"""
+    results = {}
+    preset_name, preset = inference.get_render_preset(args.preset)
+    pipe = inference.get_video_pipe()
+    image_path = inference.local_image_path(images[0])
+    workspace = tempfile.mkdtemp(prefix='stages_', dir='.')
+
+    script = web.get_genai_client().models.generate_content(
+        model='benchmark', contents=web.build_script_prompt({'numScenes': str(args.scenes)})
+    ).text
+    results['script_parse'], _ = measure(lambda: web.parse_script_to_scenes(script, 'Sci-Fi', 'Cinematic'), args.requests)
+
+    results['wan_scene_render'], rendered = measure(
+        lambda: inference.render_scene_clip(pipe, image_path, 'benchmark', preset, 0), args.requests
+    )
+    frames = rendered[0]
+
+    clips = []
+
+    def encode_clip():
+        clip_path = os.path.join(workspace, f"clip_{len(clips)}.mp4")
+        clips.append(inference.finish_scene_clip(frames, clip_path, preset['fps']))
+
+    results['clip_encode'], _ = measure(encode_clip, max(args.requests, args.scenes))
+
+    results['concat_encode'], _ = measure(
+        lambda: inference.concatenate_clips(clips[:args.scenes], os.path.join(workspace, 'final.mp4')),
+        args.video_requests
+    )
+    results['concat_encode']['clips'] = args.scenes
+    return results
+
+
+def synthetic_movie(index):
+    movie_id = str(uuid.UUID(int=index))
+    return {
+        'id': movie_id,
+        'title': f"Benchmark Movie {index}",
+        'genre': 'Sci-Fi',
+        'style': 'Cinematic',
+        'description': 'A deterministic benchmark story ' * 4,
+        'num_scenes': '5',
+        'video_path': f"static/output/{movie_id}.mp4",
+        'video_key': f"{movie_id}.mp4",
+        'video_url': f"/static/output/{movie_id}.mp4",
+        'created_at': 1700000000 + index,
+        'created_date': '2023-11-14 22:13:20',
+        'status': 'completed',
+        'preset': 'draft',
+        'seeds': [0, 1, 2, 3, 4],
+        'scenes': [
+            {'id': n, 'title': f"Scene {n}", 'content': 'Scene text ' * 40, 'genre': 'Sci-Fi', 'style': 'Cinematic'}
+            for n in range(1, 6)
+        ],
+        'images': [f"/static/output/scene_{n}_{index:08x}.jpg" for n in range(1, 6)]
+    }
+
+
+def bench_history(web, movie_store, sizes, repeat):
+    """History endpoints and store writes at several history sizes"""
+    client = web.app.test_client()
+    results = {}
+    for size in sizes:
+        movies = [synthetic_movie(i) for i in range(size)]
+        movie_store.save_movies(movies)
+        target = movies[size // 2]['id']
+        # Full-history reads get slow at 100k movies; keep the run bounded
+        runs = max(1, repeat if size <= 1000 else repeat // 5)
+
+        def list_movies():
+            response = client.get('/api/movies')
+            if response.status_code != 200:
+                raise RuntimeError(f"/api/movies returned {response.status_code}")
+
+        def get_movie():
+            response = client.get(f"/api/movies/{target}")
+            if response.status_code != 200:
+                raise RuntimeError(f"/api/movies/<id> returned {response.status_code}")
+
+        results[str(size)] = {
+            'store_bytes': os.path.getsize(movie_store.MOVIES_FILE),
+            'GET /api/movies': measure(list_movies, runs)[0],
+            'GET /api/movies/<id>': measure(get_movie, runs)[0],
+            'save_movie': measure(lambda: movie_store.save_movie(synthetic_movie(size + 1)), runs)[0]
+        }
+        print(f"📚 History benchmark done for {size} movies", file=sys.__stdout__)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'], cwd=REPO_DIR,
+            capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(report, baseline):
+    """Print p50 and throughput changes against a baseline report"""
+    print(f"\n📊 Compared with {baseline.get('revision')}:")
+
+    def walk(current, previous, path):
+        for key, value in current.items():
+            if not isinstance(value, dict) or key not in previous:
+                continue
+            if 'p50_ms' in value and value['p50_ms'] and previous[key].get('p50_ms'):
+                change = 100.0 * (value['p50_ms'] - previous[key]['p50_ms']) / previous[key]['p50_ms']
+                print(f"   {path}{key}: p50 {previous[key]['p50_ms']} -> {value['p50_ms']} ms ({change:+.1f}%)")
+            else:
+                walk(value, previous[key], f"{path}{key} / ")
+
+    walk(report['results'], baseline.get('results', {}), '')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark routes and render stages with fake model backends')
+    parser.add_argument('--output', default='benchmark_report.json', help='JSON report path')
+    parser.add_argument('--baseline', default=None, help='Earlier report to compare against')
+    parser.add_argument('--requests', type=int, default=5, help='Requests per script/image route and stage')
+    parser.add_argument('--video-requests', type=int, default=2, help='Requests to /generate_video and concat runs')
+    parser.add_argument('--scenes', type=int, default=3, help='Scenes per movie')
+    parser.add_argument('--preset', default='draft', help='Render preset used for video benchmarks')
+    parser.add_argument('--history-sizes', default='10,1000,100000', help='Comma separated history sizes')
+    parser.add_argument('--history-repeat', type=int, default=20, help='Requests per history endpoint and size')
+    parser.add_argument('--script-latency', type=float, default=0.2, help='Fake Gemini latency (s)')
+    parser.add_argument('--sdxl-step-latency', type=float, default=0.02, help='Fake SDXL latency per step (s)')
+    parser.add_argument('--wan-step-latency', type=float, default=0.01, help='Fake Wan latency per step (s)')
+    parser.add_argument('--verbose', action='store_true', help='Show the app log while benchmarking')
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    # Fake backends and quiet background work must be configured before importing the app
+    os.environ.update({
+        'FAKE_BACKENDS': '1',
+        'FAKE_SCRIPT_LATENCY': str(args.script_latency),
+        'FAKE_SDXL_STEP_LATENCY': str(args.sdxl_step_latency),
+        'FAKE_WAN_STEP_LATENCY': str(args.wan_step_latency),
+        # Repeated identical prompts would otherwise be served from the Gemini cache
+        'GEMINI_CACHE_TTL': '0',
+        'INFERENCE_MODE': 'local',
+        'VIDEO_STORAGE_TYPE': 'local',
+        'RETENTION_INTERVAL': '0',
+        'IMPORT_TIME_REPORT': '0'
+    })
+    sys.path.insert(0, REPO_DIR)
+    workdir = tempfile.mkdtemp(prefix='movie-benchmark-')
+    os.chdir(workdir)
+    print(f"🧪 Benchmarking in {workdir}")
+
+    log = sys.stdout if args.verbose else open(os.devnull, 'w')
+    with contextlib.redirect_stdout(log):
+        import app as web
+        import inference
+        import movie_store
+
+        started = time.time()
+        routes, images = bench_routes(web, args)
+        print("🌐 Route benchmarks done", file=sys.__stdout__)
+        stages = bench_stages(inference, web, images, args)
+        print("⚙️ Stage benchmarks done", file=sys.__stdout__)
+        sizes = [int(size) for size in args.history_sizes.split(',') if size.strip()]
+        history = bench_history(web, movie_store, sizes, args.history_repeat)
+
+    report = {
+        'revision': git_revision(),
+        'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'duration_seconds': round(time.time() - started, 1),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {
+            'requests': args.requests,
+            'video_requests': args.video_requests,
+            'scenes': args.scenes,
+            'preset': args.preset,
+            'history_sizes': sizes,
+            'script_latency': args.script_latency,
+            'sdxl_step_latency': args.sdxl_step_latency,
+            'wan_step_latency': args.wan_step_latency
+        },
+        'results': {
+            'routes': routes,
+            'stages': stages,
+            'history': history
+        }
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"✅ Benchmark report written to {output}")
+
+    if baseline:
+        compare(report, baseline)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
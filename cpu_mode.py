@@ -0,0 +1,164 @@
+"""
+CPU-only inference for nodes without a GPU.
+configure_cpu_environment() pins the process to CPU_AFFINITY and sizes the
+OpenMP/MKL thread pools; it has to run before torch is imported, so
+inference.py calls it first and GPU-less nodes (INFERENCE_DEVICE=auto) are
+detected from the driver files rather than with torch. Once the pipelines
+are loaded, the linear layers of the SDXL UNet and the Wan transformer(s)
+are dynamically quantized to int8 (weights stored as int8, activations
+quantized on the fly), which roughly halves their matmul time on CPUs with
+VNNI/AMX and quarters their weight memory. With CPU_BACKEND=onnx or
+openvino the SDXL pipeline is instead exported once to CPU_EXPORT_DIR with
+optimum and run by ONNX Runtime or OpenVINO; the Wan pipeline has no such
+export and stays on torch.
+"""
+
+import os
+
+INFERENCE_DEVICE = os.getenv('INFERENCE_DEVICE', 'auto')  # auto | cuda | cpu
+CPU_THREADS = int(os.getenv('CPU_THREADS', '0'))  # 0 = every core this process may run on
+CPU_AFFINITY = os.getenv('CPU_AFFINITY', '')  # e.g. "0-15" or "0,2,4,6"
+CPU_QUANTIZE = os.getenv('CPU_QUANTIZE', '1') == '1'
+CPU_BACKEND = os.getenv('CPU_BACKEND', 'torch')  # torch | onnx | openvino
+CPU_EXPORT_DIR = os.getenv('CPU_EXPORT_DIR', 'data/cpu_models')
+
+# Smaller render settings used in CPU mode, applied over the GPU presets
+CPU_PRESET_OVERRIDES = {
+    'draft': {'num_frames': 9, 'num_inference_steps': 8, 'max_area': 256 * 448, 'fps': 8},
+    'final_upscaled': {'num_frames': 17, 'num_inference_steps': 16, 'max_area': 256 * 448,
+                       'output_area': 480 * 832, 'fps': 8, 'output_fps': 16},
+    'final': {'num_frames': 17, 'num_inference_steps': 20, 'max_area': 320 * 576,
+              'output_area': 480 * 832, 'fps': 8, 'output_fps': 16}
+}
+
+
+def parse_cpu_list(spec):
+    """CPU ids of a list like "0-3,8,10-11" """
+    cpus = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if '-' in part:
+            start, end = part.split('-', 1)
+            cpus.update(range(int(start), int(end) + 1))
+        elif part:
+            cpus.add(int(part))
+    return cpus
+
+
+def available_cpus():
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def gpu_present():
+    """Whether the node looks like it has a usable GPU, judged without importing torch"""
+    visible = os.getenv('CUDA_VISIBLE_DEVICES')
+    if visible is not None and visible.strip() in ('', '-1'):
+        return False
+    nvidia = '/proc/driver/nvidia/gpus'
+    if os.path.isdir(nvidia) and os.listdir(nvidia):
+        return True
+    # NVIDIA device nodes, or the ROCm kernel driver
+    return os.path.exists('/dev/nvidia0') or os.path.exists('/dev/kfd')
+
+
+def cpu_mode_requested(fake_backends=False):
+    """CPU mode for INFERENCE_DEVICE=cpu, or for auto on a node without a GPU
+    (fake backends keep the GPU presets unless CPU mode is asked for)"""
+    if INFERENCE_DEVICE == 'cpu':
+        return True
+    return INFERENCE_DEVICE == 'auto' and not fake_backends and not gpu_present()
+
+
+def configure_cpu_environment(fake_backends=False):
+    """Pin the process and size the thread pools for CPU inference.
+
+    Only acts in CPU mode (see cpu_mode_requested), as the OpenMP settings
+    are read when torch is imported. Returns the thread count, or None.
+    """
+    if not cpu_mode_requested(fake_backends):
+        return None
+    if CPU_AFFINITY and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, parse_cpu_list(CPU_AFFINITY))
+    threads = CPU_THREADS or available_cpus()
+    os.environ.setdefault('OMP_NUM_THREADS', str(threads))
+    os.environ.setdefault('MKL_NUM_THREADS', str(threads))
+    # Keep OpenMP workers on their cores and let them sleep soon after a
+    # parallel region, so the post-processing threads are not starved
+    os.environ.setdefault('KMP_AFFINITY', 'granularity=fine,compact,1,0')
+    os.environ.setdefault('KMP_BLOCKTIME', '1')
+    print(f"🧮 CPU inference: {threads} threads{f' on CPUs {CPU_AFFINITY}' if CPU_AFFINITY else ''}")
+    return threads
+
+
+def inference_device():
+    """'cuda' or 'cpu' according to INFERENCE_DEVICE and what is available"""
+    import torch
+    if INFERENCE_DEVICE in ('cuda', 'cpu'):
+        return INFERENCE_DEVICE
+    return 'cuda' if torch.cuda.is_available() else 'cpu'
+
+
+def tune_torch_threads():
+    """Intra-op threads for every usable core, a few inter-op threads"""
+    import torch
+    threads = CPU_THREADS or available_cpus()
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(max(1, min(4, threads // 8)))
+    except RuntimeError:
+        # Only settable before the first parallel region; keep the default
+        pass
+    return threads
+
+
+def apply_cpu_presets(presets):
+    """Shrink the render presets in place for CPU mode"""
+    for name, overrides in CPU_PRESET_OVERRIDES.items():
+        if name in presets:
+            presets[name].update(overrides)
+            presets[name]['vae_tiling'] = True
+    return presets
+
+
+def quantize_linear_layers(module, name):
+    """Dynamically quantize the nn.Linear layers of module to int8 in place"""
+    import torch
+    count = sum(1 for layer in module.modules() if isinstance(layer, torch.nn.Linear))
+    torch.ao.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    print(f"🧮 Quantized {count} linear layers of the {name} to int8")
+    return module
+
+
+def load_exported_sdxl(build_torch_pipe):
+    """SDXL pipeline exported for CPU_BACKEND (onnx or openvino), or None.
+
+    The first call builds the torch pipeline with build_torch_pipe(), saves
+    it and exports it with optimum into CPU_EXPORT_DIR; later loads reuse the
+    export. Falls back (None) when optimum is not installed or export fails.
+    """
+    if CPU_BACKEND not in ('onnx', 'openvino'):
+        return None
+    try:
+        if CPU_BACKEND == 'onnx':
+            from optimum.onnxruntime import ORTStableDiffusionXLPipeline as ExportedPipeline
+        else:
+            from optimum.intel import OVStableDiffusionXLPipeline as ExportedPipeline
+    except ImportError as e:
+        print(f"⚠️ CPU_BACKEND={CPU_BACKEND} needs optimum ({e}); using torch")
+        return None
+
+    export_dir = os.path.join(CPU_EXPORT_DIR, f"sdxl-lightning-{CPU_BACKEND}")
+    try:
+        if not os.path.exists(os.path.join(export_dir, 'model_index.json')):
+            source_dir = os.path.join(CPU_EXPORT_DIR, 'sdxl-lightning-torch')
+            print(f"📦 Exporting SDXL Lightning for {CPU_BACKEND} to {export_dir} (one-off)")
+            build_torch_pipe().save_pretrained(source_dir)
+            ExportedPipeline.from_pretrained(source_dir, export=True).save_pretrained(export_dir)
+        pipe = ExportedPipeline.from_pretrained(export_dir)
+        print(f"✅ SDXL Lightning loaded with {CPU_BACKEND}")
+        return pipe
+    except Exception as e:
+        print(f"⚠️ {CPU_BACKEND} export of SDXL failed ({e}); using torch")
+        return None
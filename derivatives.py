@@ -0,0 +1,136 @@
+"""
+Derivatives of scene images and posters.
+Every saved original (scene_*.jpg, poster_*.jpg) gets thumbnails at
+THUMBNAIL_WIDTHS and WebP/AVIF encodings of the thumbnails and the full
+image, written next to it by a background pool so saving never waits for
+the encoders. Names are derived from the original, e.g.
+scene_1_ab12cd34.jpg -> scene_1_ab12cd34_w256.webp, scene_1_ab12cd34.avif.
+Originals are never overwritten, so all of them can be cached as immutable.
+PIL is only imported by the pool, so the naming helpers are cheap to use
+from the web tier.
+"""
+
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+THUMBNAIL_WIDTHS = tuple(int(w) for w in os.getenv('THUMBNAIL_WIDTHS', '256,512').split(',') if w.strip())
+DERIVATIVE_FORMATS = tuple(f.strip() for f in os.getenv('DERIVATIVE_FORMATS', 'webp,avif').split(',') if f.strip())
+DERIVATIVE_QUALITY = {
+    'webp': int(os.getenv('WEBP_QUALITY', '80')),
+    'avif': int(os.getenv('AVIF_QUALITY', '60'))
+}
+PIL_FORMATS = {'webp': 'WEBP', 'avif': 'AVIF'}
+
+DERIVATIVE_PATTERN = re.compile(r'^(?P<stem>.+?)(_w\d+)?\.(webp|avif)$')
+
+derivative_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('DERIVATIVE_WORKERS', '2')), thread_name_prefix='derivatives'
+)
+
+_supported_formats = None
+_supported_formats_lock = threading.Lock()
+
+
+def variant_name(name, width, fmt):
+    """File name of the fmt derivative of name at width (None for full size)"""
+    stem = os.path.splitext(os.path.basename(name))[0]
+    return f"{stem}_w{width}.{fmt}" if width else f"{stem}.{fmt}"
+
+
+def source_name(name):
+    """Name of the original a derivative was made from (assumed .jpg), or None"""
+    match = DERIVATIVE_PATTERN.match(name)
+    return f"{match.group('stem')}.jpg" if match else None
+
+
+def variant_urls(image_ref, formats=None):
+    """{'webp': {'256': ref, '512': ref, 'full': ref}, ...} next to image_ref (a path or URL)"""
+    directory = os.path.dirname(image_ref)
+    variants = {}
+    for fmt in formats if formats is not None else DERIVATIVE_FORMATS:
+        variants[fmt] = {
+            str(width or 'full'): f"{directory}/{variant_name(image_ref, width, fmt)}"
+            for width in THUMBNAIL_WIDTHS + (None,)
+        }
+    return variants
+
+
+def existing_variants(image_url):
+    """variant_urls of an image URL ('/static/...') limited to the files that exist"""
+    local_dir = os.path.dirname(image_url.lstrip('/') if image_url.startswith('/static/') else image_url)
+    variants = {}
+    for fmt, sizes in variant_urls(image_url).items():
+        found = {size: url for size, url in sizes.items()
+                 if os.path.exists(os.path.join(local_dir, os.path.basename(url)))}
+        if found:
+            variants[fmt] = found
+    return variants
+
+
+def supported_formats():
+    """DERIVATIVE_FORMATS this Pillow build can encode (AVIF needs Pillow 11.2+ or pillow-avif-plugin)"""
+    global _supported_formats
+    with _supported_formats_lock:
+        if _supported_formats is None:
+            from PIL import Image
+            if 'avif' in DERIVATIVE_FORMATS:
+                try:
+                    import pillow_avif  # noqa: F401  registers the AVIF plugin on older Pillow
+                except ImportError:
+                    pass
+            Image.init()
+            _supported_formats = tuple(
+                fmt for fmt in DERIVATIVE_FORMATS if PIL_FORMATS.get(fmt) in Image.SAVE
+            )
+            skipped = set(DERIVATIVE_FORMATS) - set(_supported_formats)
+            if skipped:
+                print(f"⚠️ Pillow cannot encode {', '.join(sorted(skipped))}; skipping those derivatives")
+        return _supported_formats
+
+
+def build_derivatives(image_path, image=None):
+    """Write every derivative of image_path (image is the already decoded original, if at hand).
+
+    Files are written under a temporary name and renamed, so a derivative is
+    never served half-written. Returns the paths written.
+    """
+    from PIL import Image
+    if image is None:
+        image = Image.open(image_path)
+    image = image.convert('RGB')
+    directory = os.path.dirname(image_path)
+    written = []
+
+    sizes = [(None, image)]
+    for width in sorted(THUMBNAIL_WIDTHS, reverse=True):
+        if width >= image.width:
+            continue
+        # Each thumbnail is resized from the next larger one, which is cheaper and just as sharp
+        source = sizes[-1][1]
+        height = max(1, round(image.height * width / image.width))
+        sizes.append((width, source.resize((width, height), Image.LANCZOS)))
+
+    for width, resized in sizes:
+        for fmt in supported_formats():
+            path = os.path.join(directory, variant_name(image_path, width, fmt))
+            resized.save(f"{path}.tmp", format=PIL_FORMATS[fmt], quality=DERIVATIVE_QUALITY[fmt])
+            os.replace(f"{path}.tmp", path)
+            written.append(path)
+    return written
+
+
+def _build_logged(image_path, image):
+    try:
+        written = build_derivatives(image_path, image)
+        print(f"🖼️ {len(written)} derivatives written for {os.path.basename(image_path)}")
+        return written
+    except Exception as e:
+        print(f"⚠️ Derivatives failed for {image_path}: {e}")
+        raise
+
+
+def submit_derivatives(image_path, image=None):
+    """Build the derivatives of image_path on the background pool, returns the future"""
+    return derivative_executor.submit(_build_logged, image_path, image)
@@ -0,0 +1,268 @@
+"""
+Deterministic stand-ins for the Gemini client, the SDXL pipeline and the Wan
+pipeline, used by benchmark.py and the load tester (FAKE_BACKENDS=1).
+They sleep for a configurable time per call or denoising step and return
+outputs of the same shape the real models produce, derived from a hash of
+the prompt so repeated runs are identical. No GPU, weights or API key needed.
+
+Run as a script to serve the fake Gemini model over HTTP, as a local stand-in
+for the real API (set GEMINI_BASE_URL to its address), and optionally a fake
+ElevenLabs text-to-speech API (set ELEVENLABS_BASE_URL and any
+ELEVENLABS_API_KEY):
+    python fake_backends.py --gemini-port 8765 --error-rate 0.2
+    python fake_backends.py --tts-port 8766
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import time
+import wave
+import random
+import hashlib
+import threading
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import numpy as np
+
+FAKE_BACKENDS = os.getenv('FAKE_BACKENDS', '0') == '1'
+
+# Latencies in seconds
+FAKE_SCRIPT_LATENCY = float(os.getenv('FAKE_SCRIPT_LATENCY', '0.5'))
+FAKE_SDXL_STEP_LATENCY = float(os.getenv('FAKE_SDXL_STEP_LATENCY', '0.05'))
+FAKE_WAN_STEP_LATENCY = float(os.getenv('FAKE_WAN_STEP_LATENCY', '0.05'))
+FAKE_TTS_LATENCY = float(os.getenv('FAKE_TTS_LATENCY', '0.3'))
+FAKE_TTS_SECONDS_PER_WORD = 0.4
+
+
+def _seed(*parts):
+    digest = hashlib.sha256('|'.join(str(p) for p in parts).encode('utf-8')).digest()
+    return int.from_bytes(digest[:4], 'little')
+
+
+def _run_steps(pipeline, steps, step_latency, callback):
+    """Sleep through the denoising loop, calling callback_on_step_end like diffusers"""
+    pipeline._interrupt = False
+    for step in range(steps):
+        time.sleep(step_latency)
+        if callback:
+            callback(pipeline, step, steps - step, {})
+        if pipeline._interrupt:
+            break
+
+
+class FakeGenaiClient:
+    """Mimics genai.Client().models.generate_content for script, outline and scene prompts"""
+
+    def __init__(self, latency=None):
+        self.latency = FAKE_SCRIPT_LATENCY if latency is None else latency
+        self.models = self
+
+    def generate_content(self, model, contents, config=None):
+        time.sleep(self.latency)
+        prompt = contents if isinstance(contents, str) else str(contents)
+        match = re.search(r'Number of Scenes:\s*(\d+)', prompt)
+        num_scenes = int(match.group(1)) if match else 5
+        rng = np.random.default_rng(_seed(model, prompt))
+        words = ['the', 'hero', 'storm', 'city', 'light', 'shadow', 'runs', 'falls', 'rises', 'quietly']
+        if '{"scenes"' in prompt:
+            text = json.dumps({'scenes': [
+                {'title': f"Part {number}", 'summary': ' '.join(rng.choice(words, size=12)).capitalize() + '.'}
+                for number in range(1, num_scenes + 1)
+            ]})
+        elif re.search(r'Write Scene \d+ of', prompt):
+            text = ' '.join(rng.choice(words, size=60)).capitalize() + '.'
+        else:
+            scenes = []
+            for number in range(1, num_scenes + 1):
+                body = ' '.join(rng.choice(words, size=60))
+                scenes.append(f"Scene {number}: Part {number}\n{body.capitalize()}.")
+            text = '\n\n'.join(scenes)
+        usage = SimpleNamespace(prompt_token_count=len(prompt.split()), candidates_token_count=len(text.split()))
+        return SimpleNamespace(text=text, usage_metadata=usage)
+
+
+class FakeSDXLPipeline:
+    """Returns one flat-coloured RGB image per prompt after step_latency per step"""
+
+    def __init__(self, step_latency=None):
+        self.step_latency = FAKE_SDXL_STEP_LATENCY if step_latency is None else step_latency
+        self._interrupt = False
+
+    def __call__(self, prompt, negative_prompt=None, num_inference_steps=4, guidance_scale=0,
+                 height=1024, width=1024, callback_on_step_end=None, **kwargs):
+        from PIL import Image
+        prompts = prompt if isinstance(prompt, list) else [prompt]
+        _run_steps(self, num_inference_steps, self.step_latency * len(prompts), callback_on_step_end)
+        images = []
+        for text in prompts:
+            rng = np.random.default_rng(_seed(text, width, height))
+            color = tuple(int(c) for c in rng.integers(0, 256, size=3))
+            images.append(Image.new('RGB', (width, height), color=color))
+        return SimpleNamespace(images=images)
+
+
+class FakeWanPipeline:
+    """Returns num_frames float RGB frames in [0, 1] after step_latency per step"""
+
+    vae_scale_factor_spatial = 8
+    device = 'cpu'
+
+    def __init__(self, step_latency=None):
+        self.step_latency = FAKE_WAN_STEP_LATENCY if step_latency is None else step_latency
+        self.transformer = SimpleNamespace(config=SimpleNamespace(patch_size=(1, 2, 2)))
+        self._interrupt = False
+
+    def __call__(self, image=None, prompt='', negative_prompt=None, height=480, width=832, num_frames=41,
+                 guidance_scale=3.5, num_inference_steps=40, generator=None, callback_on_step_end=None, **kwargs):
+        _run_steps(self, num_inference_steps, self.step_latency, callback_on_step_end)
+        base = np.asarray(image.resize((width, height)), dtype=np.float32) / 255.0 if image is not None \
+            else np.zeros((height, width, 3), dtype=np.float32)
+        # A slow brightness ramp so encoders see real motion between frames
+        ramp = np.linspace(0.0, 0.2, num_frames, dtype=np.float32)[:, None, None, None]
+        frames = np.clip(base[None] * 0.8 + ramp, 0.0, 1.0)
+        return SimpleNamespace(frames=[frames])
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    """Answers POST .../models/<model>:generateContent like the Gemini REST API"""
+
+    client = None
+    error_rate = 0.0
+
+    def do_POST(self):
+        match = re.search(r'/models/([^/:]+):generateContent', self.path)
+        if not match:
+            self._reply(404, {'error': {'code': 404, 'message': 'Not found', 'status': 'NOT_FOUND'}})
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+
+        # Injected failures let callers exercise their retry and backoff paths
+        if random.random() < self.error_rate:
+            code = random.choice([429, 500, 503])
+            status = {429: 'RESOURCE_EXHAUSTED', 500: 'INTERNAL', 503: 'UNAVAILABLE'}[code]
+            self._reply(code, {'error': {'code': code, 'message': 'Injected failure', 'status': status}})
+            return
+
+        prompt = ' '.join(
+            part.get('text', '')
+            for content in body.get('contents', [])
+            for part in content.get('parts', [])
+        )
+        response = self.client.generate_content(model=match.group(1), contents=prompt)
+        self._reply(200, {
+            'candidates': [{
+                'content': {'role': 'model', 'parts': [{'text': response.text}]},
+                'finishReason': 'STOP'
+            }],
+            'usageMetadata': {
+                'promptTokenCount': response.usage_metadata.prompt_token_count,
+                'candidatesTokenCount': response.usage_metadata.candidates_token_count,
+                'totalTokenCount': response.usage_metadata.prompt_token_count + response.usage_metadata.candidates_token_count
+            }
+        })
+
+    def _reply(self, code, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def fake_speech(text, sample_rate=22050):
+    """WAV bytes of a tone lasting FAKE_TTS_SECONDS_PER_WORD per word, pitched by the text"""
+    seconds = max(0.5, len(text.split()) * FAKE_TTS_SECONDS_PER_WORD)
+    frequency = 180 + _seed(text) % 220
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    samples = (0.3 * np.sin(2 * np.pi * frequency * t) * 32767).astype('<i2')
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+class FakeTTSHandler(BaseHTTPRequestHandler):
+    """Answers POST /v1/text-to-speech/<voice> like the ElevenLabs API, with a WAV tone"""
+
+    latency = FAKE_TTS_LATENCY
+    error_rate = 0.0
+
+    def do_POST(self):
+        match = re.match(r'/v1/text-to-speech/([^/?]+)', self.path)
+        if not match:
+            self._reply(404, 'application/json', b'{"detail": "Not found"}')
+            return
+        if not self.headers.get('xi-api-key'):
+            self._reply(401, 'application/json', b'{"detail": "Missing xi-api-key"}')
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        if random.random() < self.error_rate:
+            self._reply(random.choice([429, 503]), 'application/json', b'{"detail": "Injected failure"}')
+            return
+        time.sleep(self.latency)
+        self._reply(200, 'audio/wav', fake_speech(f"{match.group(1)}|{body.get('text', '')}"))
+
+    def _reply(self, code, content_type, data):
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_fake_tts(port, latency=None, error_rate=0.0):
+    """Serve the fake text-to-speech API on localhost until interrupted"""
+    FakeTTSHandler.latency = FAKE_TTS_LATENCY if latency is None else latency
+    FakeTTSHandler.error_rate = error_rate
+    server = ThreadingHTTPServer(('127.0.0.1', port), FakeTTSHandler)
+    print(f"🧪 Fake TTS API on http://127.0.0.1:{port} (error rate {error_rate:.0%})")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def serve_fake_gemini(port, latency=None, error_rate=0.0):
+    """Serve the fake Gemini model on localhost until interrupted"""
+    FakeGeminiHandler.client = FakeGenaiClient(latency)
+    FakeGeminiHandler.error_rate = error_rate
+    server = ThreadingHTTPServer(('127.0.0.1', port), FakeGeminiHandler)
+    print(f"🧪 Fake Gemini API on http://127.0.0.1:{port} (error rate {error_rate:.0%})")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local HTTP stand-ins for the Gemini and ElevenLabs APIs')
+    parser.add_argument('--gemini-port', type=int, default=8765)
+    parser.add_argument('--tts-port', type=int, default=None, help='Also serve the fake TTS API on this port')
+    parser.add_argument('--latency', type=float, default=None, help='Seconds per call (default FAKE_SCRIPT_LATENCY)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of calls answered with 429/5xx')
+    args = parser.parse_args()
+    if args.tts_port:
+        threading.Thread(
+            target=serve_fake_tts, args=(args.tts_port, None, args.error_rate), daemon=True
+        ).start()
+    try:
+        serve_fake_gemini(args.gemini_port, args.latency, args.error_rate)
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -0,0 +1,209 @@
+"""
+Resilient wrapper around the Gemini client.
+GeminiClient exposes the same models.generate_content(model=..., contents=...)
+call as google-genai, adding a TTL cache keyed on model + prompt, a bounded
+concurrency semaphore, a per-call timeout, exponential backoff with jitter on
+429/5xx/timeouts, and latency and token metrics. Point GEMINI_BASE_URL at a
+local stand-in (python fake_backends.py --gemini-port 8765) to test it
+without the real API.
+"""
+
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+GEMINI_BASE_URL = os.getenv('GEMINI_BASE_URL', '')
+GEMINI_CACHE_TTL = int(os.getenv('GEMINI_CACHE_TTL', '3600'))  # seconds, 0 disables the cache
+GEMINI_CACHE_SIZE = int(os.getenv('GEMINI_CACHE_SIZE', '256'))
+GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', '8'))
+GEMINI_TIMEOUT = float(os.getenv('GEMINI_TIMEOUT', '60'))  # seconds per attempt
+GEMINI_MAX_RETRIES = int(os.getenv('GEMINI_MAX_RETRIES', '4'))
+GEMINI_BACKOFF_BASE = float(os.getenv('GEMINI_BACKOFF_BASE', '1.0'))  # seconds
+GEMINI_BACKOFF_MAX = float(os.getenv('GEMINI_BACKOFF_MAX', '30'))
+
+
+class GeminiTimeout(Exception):
+    """Raised when a Gemini call does not answer within the timeout"""
+    pass
+
+
+def error_status(error):
+    """HTTP status of an API error (google-genai APIError.code), if any"""
+    for attribute in ('code', 'status_code'):
+        status = getattr(error, attribute, None)
+        if isinstance(status, int):
+            return status
+    return None
+
+
+def is_retryable(error):
+    if isinstance(error, (GeminiTimeout, ConnectionError, TimeoutError)):
+        return True
+    status = error_status(error)
+    return status is not None and (status == 429 or status >= 500)
+
+
+class GeminiClient:
+    """Drop-in replacement for genai.Client().models with caching, limits and retries"""
+
+    def __init__(self, client, cache_ttl=GEMINI_CACHE_TTL, cache_size=GEMINI_CACHE_SIZE,
+                 max_concurrency=GEMINI_MAX_CONCURRENCY, timeout=GEMINI_TIMEOUT,
+                 max_retries=GEMINI_MAX_RETRIES, backoff_base=GEMINI_BACKOFF_BASE,
+                 backoff_max=GEMINI_BACKOFF_MAX):
+        self.client = client
+        self.models = self
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        # Calls run on this pool so a hung request can be abandoned after the timeout.
+        # The caller takes the semaphore before submitting and the pool thread
+        # releases it when the request really ends, so abandoned requests keep
+        # their slot and at most max_concurrency requests are ever in flight
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency * 2, thread_name_prefix='gemini')
+        self._metrics_lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self._metrics = {
+            'calls': 0,
+            'cache_hits': 0,
+            'api_requests': 0,
+            'retries': 0,
+            'timeouts': 0,
+            'abandoned': 0,
+            'errors': 0,
+            'prompt_tokens': 0,
+            'output_tokens': 0
+        }
+
+    def _count(self, **increments):
+        with self._metrics_lock:
+            for key, value in increments.items():
+                self._metrics[key] += value
+
+    def _cache_key(self, model, contents, config):
+        payload = json.dumps([model, contents, repr(config)], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _cache_get(self, key):
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires, response = entry
+            if expires < time.time():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return response
+
+    def _cache_put(self, key, response):
+        with self._cache_lock:
+            self._cache[key] = (time.time() + self.cache_ttl, response)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _call(self, model, contents, config):
+        """Returns (response, API latency); releases the semaphore taken by _attempt when done"""
+        try:
+            kwargs = {'model': model, 'contents': contents}
+            if config is not None:
+                kwargs['config'] = config
+            started = time.perf_counter()
+            response = self.client.models.generate_content(**kwargs)
+            return response, time.perf_counter() - started
+        finally:
+            self._semaphore.release()
+
+    def _attempt(self, model, contents, config):
+        # Wait for a slot before the call is handed to the pool, so the
+        # timeout only covers the time the request is actually in flight
+        self._semaphore.acquire()
+        try:
+            future = self._executor.submit(self._call, model, contents, config)
+        except Exception:
+            self._semaphore.release()
+            raise
+        self._count(api_requests=1)
+        try:
+            response, latency = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            if future.cancel():
+                # Never started, so it will never release its slot itself
+                self._semaphore.release()
+            else:
+                # Still running: it keeps its slot until it ends and its response is dropped
+                self._count(abandoned=1)
+            self._count(timeouts=1)
+            raise GeminiTimeout(f"Gemini call to {model} timed out after {self.timeout}s")
+
+        usage = getattr(response, 'usage_metadata', None)
+        with self._metrics_lock:
+            self._latencies.append(latency)
+            if usage is not None:
+                self._metrics['prompt_tokens'] += getattr(usage, 'prompt_token_count', 0) or 0
+                self._metrics['output_tokens'] += getattr(usage, 'candidates_token_count', 0) or 0
+        return response
+
+    def generate_content(self, model, contents, config=None, use_cache=True):
+        """Cached, rate-limited generate_content with retries on 429/5xx and timeouts.
+        use_cache=False skips the cache lookup (the fresh response is still cached)."""
+        self._count(calls=1)
+        key = self._cache_key(model, contents, config) if self.cache_ttl > 0 else None
+        if key and use_cache:
+            cached = self._cache_get(key)
+            if cached is not None:
+                self._count(cache_hits=1)
+                return cached
+
+        attempt = 0
+        while True:
+            try:
+                response = self._attempt(model, contents, config)
+                break
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    self._count(errors=1)
+                    raise
+                # Full jitter: sleep a random time up to the exponential bound
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                attempt += 1
+                self._count(retries=1)
+                print(f"⚠️ Gemini call failed ({e}), retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+        if key:
+            self._cache_put(key, response)
+        return response
+
+    def metrics(self):
+        """Counters plus latency percentiles over the last 1000 API requests"""
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+            latencies = sorted(self._latencies)
+        with self._cache_lock:
+            metrics['cache_entries'] = len(self._cache)
+        if latencies:
+            metrics['latency_ms'] = {
+                'p50': round(1000 * latencies[len(latencies) // 2], 1),
+                'p95': round(1000 * latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1),
+                'max': round(1000 * latencies[-1], 1)
+            }
+        return metrics
+
+
+def create_gemini_client(api_key, base_url=GEMINI_BASE_URL):
+    """google-genai client (optionally pointed at base_url) wrapped in GeminiClient"""
+    from google import genai
+    http_options = {'base_url': base_url} if base_url else None
+    return GeminiClient(genai.Client(api_key=api_key, http_options=http_options))
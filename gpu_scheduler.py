@@ -0,0 +1,142 @@
+"""
+Fair-share GPU scheduler.
+Render jobs are admitted against per-user and global queue-depth limits, then
+take the GPU one unit of work at a time (one scene clip or one image). Each
+time the GPU frees up the next unit goes to the highest priority class, and
+within a class to the user with the least recent GPU time, so a long render
+is interleaved with everyone else's work at scene granularity.
+"""
+
+import time
+import itertools
+import threading
+from contextlib import contextmanager
+
+from inference_ipc import QueueFull, RenderCancelled
+
+# Lower runs first. Drafts and scene images are 'preview', full renders 'final'.
+PRIORITY_CLASSES = {'preview': 0, 'final': 1}
+
+
+class GPUScheduler:
+    """Admission control plus a fair-share queue in front of the GPU"""
+
+    def __init__(self, slots=1, max_jobs_per_user=2, max_queued_jobs=16,
+                 priority_aging=120, usage_half_life=600):
+        self.slots = slots
+        self.max_jobs_per_user = max_jobs_per_user
+        self.max_queued_jobs = max_queued_jobs
+        # Seconds after which a waiting 'final' unit is treated like a 'preview'
+        self.priority_aging = priority_aging
+        self.usage_half_life = usage_half_life
+        self._cond = threading.Condition()
+        self._jobs = {}
+        self._waiting = []
+        self._running = 0
+        self._usage = {}
+        self._sequence = itertools.count()
+
+    def admit(self, job_id, user, priority='final'):
+        """Register a job, or raise QueueFull when the user or the queue is at its limit"""
+        with self._cond:
+            if len(self._jobs) >= self.max_queued_jobs:
+                raise QueueFull(f"GPU queue is full ({self.max_queued_jobs} jobs)")
+            user_jobs = sum(1 for job in self._jobs.values() if job['user'] == user)
+            if user_jobs >= self.max_jobs_per_user:
+                raise QueueFull(f"You already have {user_jobs} jobs queued or rendering")
+            self._jobs[job_id] = {
+                'user': user,
+                'priority': PRIORITY_CLASSES.get(priority, PRIORITY_CLASSES['final']),
+                'admitted_at': time.time()
+            }
+
+    def release(self, job_id):
+        """Forget a finished job"""
+        with self._cond:
+            self._jobs.pop(job_id, None)
+            self._waiting = [ticket for ticket in self._waiting if ticket['job_id'] != job_id]
+            self._cond.notify_all()
+
+    def _decayed_usage(self, user, now):
+        usage, updated = self._usage.get(user, (0.0, now))
+        return usage * 0.5 ** ((now - updated) / self.usage_half_life)
+
+    def _rank(self, ticket, now):
+        priority = ticket['priority']
+        if now - ticket['enqueued_at'] > self.priority_aging:
+            priority = 0
+        return (priority, self._decayed_usage(ticket['user'], now), ticket['sequence'])
+
+    def _next_ticket(self):
+        now = time.time()
+        return min(self._waiting, key=lambda t: self._rank(t, now)) if self._waiting else None
+
+    @contextmanager
+    def slot(self, job_id, is_cancelled=None):
+        """Hold a GPU slot for one unit of work of an admitted job.
+
+        Blocks until the scheduler picks this job. is_cancelled is polled while
+        waiting so a cancelled job leaves the queue with RenderCancelled.
+        """
+        with self._cond:
+            job = self._jobs.get(job_id) or {'user': 'anonymous', 'priority': PRIORITY_CLASSES['final']}
+            ticket = {
+                'job_id': job_id,
+                'user': job['user'],
+                'priority': job['priority'],
+                'sequence': next(self._sequence),
+                'enqueued_at': time.time()
+            }
+            self._waiting.append(ticket)
+
+        try:
+            while True:
+                with self._cond:
+                    if self._running < self.slots and self._next_ticket() is ticket:
+                        self._waiting.remove(ticket)
+                        self._running += 1
+                        break
+                    self._cond.wait(timeout=1.0)
+                if is_cancelled and is_cancelled():
+                    raise RenderCancelled(f"Render job {job_id} cancelled while queued")
+        except BaseException:
+            with self._cond:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                self._cond.notify_all()
+            raise
+
+        started = time.time()
+        try:
+            yield
+        finally:
+            with self._cond:
+                now = time.time()
+                self._usage[ticket['user']] = (self._decayed_usage(ticket['user'], now) + now - started, now)
+                self._running -= 1
+                self._cond.notify_all()
+
+    def queue_position(self, job_id):
+        """1-based position of a job's waiting unit in scheduling order, or None"""
+        with self._cond:
+            now = time.time()
+            order = sorted(self._waiting, key=lambda t: self._rank(t, now))
+            for position, ticket in enumerate(order, start=1):
+                if ticket['job_id'] == job_id:
+                    return position
+        return None
+
+    def stats(self):
+        """Queue depths for status reporting"""
+        with self._cond:
+            users = {}
+            for job in self._jobs.values():
+                users[job['user']] = users.get(job['user'], 0) + 1
+            return {
+                'jobs': len(self._jobs),
+                'waiting_units': len(self._waiting),
+                'running_units': self._running,
+                'users': len(users),
+                'max_jobs_per_user': self.max_jobs_per_user,
+                'max_queued_jobs': self.max_queued_jobs
+            }
@@ -0,0 +1,1251 @@
+"""
+Inference side of the AI Movie Generator.
+Owns the diffusion pipelines, render jobs and the GPU/CPU render stages. It is
+used in-process by app.py (INFERENCE_MODE=local) or served to web workers by
+inference_server.py (INFERENCE_MODE=remote).
+"""
+
+import os
+import shutil
+import uuid
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Thread and affinity settings of CPU mode must be in place before torch loads
+from fake_backends import FAKE_BACKENDS, FakeSDXLPipeline, FakeWanPipeline
+from cpu_mode import configure_cpu_environment
+CPU_ENVIRONMENT_THREADS = configure_cpu_environment(FAKE_BACKENDS)
+
+import torch
+import numpy as np
+from PIL import Image
+from diffusers import WanImageToVideoPipeline
+from diffusers.utils import load_image
+from moviepy.editor import VideoFileClip, concatenate_videoclips
+
+from postprocess import (
+    interpolate_frames, upscale_frames, scaled_size, latents_to_preview_jpeg, to_uint8_array, export_frames
+)
+from inference_ipc import RenderCancelled
+from gpu_scheduler import GPUScheduler
+from movie_store import load_movies, save_movie, update_movie, modify_movie
+from storage import get_storage
+from derivatives import submit_derivatives, supported_formats, variant_urls, existing_variants
+from narration import NARRATION_ENABLED, NARRATION_VOICE, submit_narration, attach_narration
+from latent_cache import ConditioningCache, ImageCache, image_digest
+from movie_artifacts import sample_scene_frames, sample_clip_frames, build_movie_artifacts
+from cpu_mode import (
+    INFERENCE_DEVICE, CPU_QUANTIZE, CPU_BACKEND, inference_device, tune_torch_threads,
+    apply_cpu_presets, quantize_linear_layers, load_exported_sdxl
+)
+import job_store
+
+# CPU mode: on nodes without a GPU (or with INFERENCE_DEVICE=cpu) the models
+# run in float32 with int8 linear layers on tuned thread pools, and the
+# presets below are shrunk (see cpu_mode.py). Fake backends on a CPU machine
+# keep the GPU presets unless CPU mode is asked for explicitly.
+DEVICE = inference_device()
+CPU_MODE = INFERENCE_DEVICE == 'cpu' or (DEVICE == 'cpu' and not FAKE_BACKENDS)
+CPU_THREADS_USED = tune_torch_threads() if CPU_MODE else None
+if CPU_MODE and CPU_ENVIRONMENT_THREADS is None:
+    print("⚠️ torch sees no GPU but the node has GPU driver files; CPU_AFFINITY and the "
+          "OpenMP/MKL settings were not applied (set INFERENCE_DEVICE=cpu)")
+
+# Render presets for video generation.
+# 'draft' is a cheap preview tier for iterating; 'final' is the full-quality
+# render used when a draft is promoted. 'max_area' is the diffusion area and
+# 'output_area' (when set) is the area clips are upscaled to afterwards.
+RENDER_PRESETS = {
+    'draft': {
+        'num_frames': 17,
+        'num_inference_steps': 12,
+        'guidance_scale': 3.5,
+        'max_area': 320 * 576,
+        'output_area': None,
+        'fps': 16,
+        'output_fps': None,
+        'vae_tiling': False,
+        'vae_slicing': False,
+        'vae_tile_size': None,
+        'priority': 'preview'
+    },
+    'final_upscaled': {
+        'num_frames': 41,
+        'num_inference_steps': 40,
+        'guidance_scale': 3.5,
+        'max_area': 352 * 608,
+        'output_area': 480 * 832,
+        'fps': 16,
+        'output_fps': None,
+        'vae_tiling': False,
+        'vae_slicing': True,
+        'vae_tile_size': None,
+        'priority': 'final'
+    },
+    'final': {
+        'num_frames': 41,
+        'num_inference_steps': 40,
+        'guidance_scale': 3.5,
+        'max_area': 480 * 832,
+        'output_area': None,
+        'fps': 16,
+        'output_fps': None,
+        'vae_tiling': True,
+        'vae_slicing': True,
+        'vae_tile_size': 256,
+        'priority': 'final'
+    }
+}
+# Tiled VAE decoding bounds the decoder's activation memory by the tile size
+# instead of the frame size, and sliced decoding decodes batch items one at a
+# time; both trade a little speed for fitting longer clips and larger batches.
+if CPU_MODE:
+    apply_cpu_presets(RENDER_PRESETS)
+DEFAULT_RENDER_PRESET = os.getenv('DEFAULT_RENDER_PRESET', 'draft' if CPU_MODE else 'final')
+
+# Optional frame interpolation raises the exported fps without generating more frames
+INTERPOLATION_FPS_OPTIONS = (24, 32)
+
+# Super-resolution stage: diffusion renders at a smaller base size and a CPU
+# (or model) upscaler brings the output to the target size
+UPSCALE_METHOD = os.getenv('UPSCALE_METHOD', 'lanczos')
+IMAGE_RENDER_SIZE = int(os.getenv('IMAGE_RENDER_SIZE', '768' if CPU_MODE else '1024'))
+IMAGE_OUTPUT_SIZE = int(os.getenv('IMAGE_OUTPUT_SIZE', '1024'))
+IMAGE_BATCH_SIZE = int(os.getenv('IMAGE_BATCH_SIZE', '4'))  # images per SDXL call in batch renders
+IMAGE_VAE_TILING = os.getenv('IMAGE_VAE_TILING', '0') == '1'
+IMAGE_VAE_SLICING = os.getenv('IMAGE_VAE_SLICING', '1') == '1'
+# Poster art is only rendered for movies without usable scene images (see poster.py)
+POSTER_RENDER_SIZE = tuple(int(v) for v in os.getenv('POSTER_RENDER_SIZE', '768x1344').split('x'))
+
+# Scene clips of finished movies are kept next to the videos so a single scene
+# can be re-rendered and the movie rebuilt without touching the other scenes
+KEEP_SCENE_CLIPS = os.getenv('KEEP_SCENE_CLIPS', '1') == '1'
+SCENE_CLIP_DIR = os.getenv('SCENE_CLIP_DIR', 'static/output')
+
+# Serializes rebuilds of the same movie by concurrent scene edits
+movie_edit_locks = {}
+movie_edit_locks_lock = threading.Lock()
+
+def movie_edit_lock(movie_id):
+    with movie_edit_locks_lock:
+        return movie_edit_locks.setdefault(movie_id, threading.Lock())
+
+# CPU thread pool for post-processing (interpolation, encoding) that overlaps GPU work
+POSTPROCESS_WORKERS = int(os.getenv('POSTPROCESS_WORKERS', '2'))
+postprocess_executor = ThreadPoolExecutor(max_workers=POSTPROCESS_WORKERS, thread_name_prefix='postprocess')
+
+# Fair-share scheduler in front of the GPU: one scene clip or image at a time
+gpu_scheduler = GPUScheduler(
+    slots=int(os.getenv('GPU_SLOTS', '1')),
+    max_jobs_per_user=int(os.getenv('GPU_MAX_JOBS_PER_USER', '2')),
+    max_queued_jobs=int(os.getenv('GPU_MAX_QUEUED_JOBS', '16')),
+    priority_aging=int(os.getenv('GPU_PRIORITY_AGING', '120'))
+)
+
+VIDEO_MODEL = os.getenv(
+    'VIDEO_MODEL', 'Wan-AI/Wan2.2-TI2V-5B-Diffusers' if CPU_MODE else 'Wan-AI/Wan2.2-I2V-A14B-Diffusers'
+)
+
+# Initialize SDXL Lightning pipeline for images
+sdxl_pipe = None
+sdxl_pipe_lock = threading.Lock()
+
+def get_sdxl_pipe():
+    global sdxl_pipe
+    if sdxl_pipe is None:
+        with sdxl_pipe_lock:
+            if sdxl_pipe is None and FAKE_BACKENDS:
+                print("Using fake SDXL pipeline (FAKE_BACKENDS=1)")
+                sdxl_pipe = FakeSDXLPipeline()
+            if sdxl_pipe is None:
+                print("Loading SDXL Lightning model...")
+                from diffusers import StableDiffusionXLPipeline, UNet2DConditionModel, EulerDiscreteScheduler
+                from huggingface_hub import hf_hub_download
+                from safetensors.torch import load_file
+                
+                base = "stabilityai/stable-diffusion-xl-base-1.0"
+                repo = "ByteDance/SDXL-Lightning"
+                ckpt = "sdxl_lightning_4step_unet.safetensors"
+                
+                device = DEVICE
+                dtype = torch.float16 if device == "cuda" else torch.float32
+                
+                def build():
+                    unet = UNet2DConditionModel.from_config(base, subfolder="unet").to(device, dtype)
+                    unet.load_state_dict(load_file(hf_hub_download(repo, ckpt), device=device))
+                    return StableDiffusionXLPipeline.from_pretrained(base, unet=unet, torch_dtype=dtype).to(device)
+                
+                # Load model (exported for ONNX Runtime/OpenVINO in CPU mode when configured)
+                pipe = load_exported_sdxl(build) if CPU_MODE else None
+                if pipe is None:
+                    pipe = build()
+                    if CPU_MODE and CPU_QUANTIZE:
+                        quantize_linear_layers(pipe.unet, 'SDXL UNet')
+                
+                # Ensure sampler uses "trailing" timesteps
+                pipe.scheduler = EulerDiscreteScheduler.from_config(pipe.scheduler.config, timestep_spacing="trailing")
+                sdxl_pipe = pipe
+                configure_vae(sdxl_pipe, IMAGE_VAE_TILING, IMAGE_VAE_SLICING)
+                
+    return sdxl_pipe
+
+def configure_vae(pipe, tiling=False, slicing=False, tile_size=None):
+    """Switch a pipeline's VAE between full, tiled and sliced decoding.
+    
+    Only touches the VAE when the mode changes; pipelines without a torch VAE
+    (the fake backends, ONNX Runtime/OpenVINO exports) are left alone.
+    tile_size is the tile edge in pixels for VAEs that accept one (Wan), with
+    a quarter overlap between tiles.
+    """
+    vae = getattr(pipe, 'vae', None)
+    mode = (bool(tiling), bool(slicing), tile_size)
+    if not hasattr(vae, 'enable_tiling') or getattr(pipe, '_vae_mode', None) == mode:
+        return
+    if tiling:
+        try:
+            if tile_size:
+                vae.enable_tiling(
+                    tile_sample_min_height=tile_size, tile_sample_min_width=tile_size,
+                    tile_sample_stride_height=tile_size * 3 // 4, tile_sample_stride_width=tile_size * 3 // 4
+                )
+            else:
+                vae.enable_tiling()
+        except TypeError:
+            # VAEs with fixed tiles (SDXL's AutoencoderKL) take no sizes
+            vae.enable_tiling()
+    else:
+        vae.disable_tiling()
+    if slicing:
+        vae.enable_slicing()
+    else:
+        vae.disable_slicing()
+    pipe._vae_mode = mode
+    print(f"   🧩 VAE decode: tiling {'on' if tiling else 'off'}"
+          f"{f' ({tile_size}px tiles)' if tiling and tile_size else ''}, slicing {'on' if slicing else 'off'}")
+
+# Initialize video pipeline (lazy load)
+video_pipe = None
+video_pipe_lock = threading.Lock()
+
+def get_video_pipe():
+    global video_pipe
+    if video_pipe is None:
+        with video_pipe_lock:
+            if video_pipe is None and FAKE_BACKENDS:
+                print("Using fake Wan pipeline (FAKE_BACKENDS=1)")
+                video_pipe = FakeWanPipeline()
+            if video_pipe is None:
+                print(f"Loading Wan video model {VIDEO_MODEL}...")
+                device = DEVICE
+                dtype = torch.bfloat16 if device == "cuda" else torch.float32
+                pipe = WanImageToVideoPipeline.from_pretrained(VIDEO_MODEL, torch_dtype=dtype)
+                pipe.to(device)
+                if CPU_MODE:
+                    # Both experts of Wan2.2 A14B, or the single transformer of smaller models
+                    for name in ('transformer', 'transformer_2'):
+                        if CPU_QUANTIZE and getattr(pipe, name, None) is not None:
+                            quantize_linear_layers(getattr(pipe, name), f"Wan {name}")
+                else:
+                    pipe.enable_model_cpu_offload()
+                conditioning_cache.install(pipe)
+                video_pipe = pipe
+    return video_pipe
+
+# Conditioning work of I2V calls (load, resize, VAE encode) is done once per
+# distinct image, size and frame count, whatever the seed, steps or prompt
+conditioning_cache = ConditioningCache()
+prepared_images = ImageCache()
+
+def prepare_scene_image(pipe, img_path, max_area):
+    """Load a scene image and resize it for the video pipeline, cached by image
+    content and target area; returns (image, width, height, content digest)"""
+    digest = image_digest(img_path)
+    mod_value = pipe.vae_scale_factor_spatial * pipe.transformer.config.patch_size[1]
+    
+    def load():
+        print("📸 LOADING SCENE IMAGE...")
+        image = load_image(img_path)
+        print(f"   📏 Original size: {image.size} pixels")
+        print(f"   📐 Aspect ratio: {image.height/image.width:.2f}")
+        
+        # Calculate dimensions
+        print("🔧 CALCULATING OPTIMAL DIMENSIONS...")
+        aspect_ratio = image.height / image.width
+        height = round(np.sqrt(max_area * aspect_ratio)) // mod_value * mod_value
+        width = round(np.sqrt(max_area / aspect_ratio)) // mod_value * mod_value
+        print(f"   📐 Calculated dimensions: {width}x{height}")
+        
+        image = image.resize((width, height))
+        print(f"   ✅ Image resized to: {image.size}")
+        return image, width, height
+    
+    image, width, height = prepared_images.get_or_create((digest, max_area, mod_value), load)
+    return image, width, height, digest
+
+# Render job registry: step-level progress and cooperative cancellation
+RENDER_JOB_TTL = int(os.getenv('RENDER_JOB_TTL', '3600'))  # seconds to keep finished jobs
+PREVIEW_EVERY_N_STEPS = int(os.getenv('PREVIEW_EVERY_N_STEPS', '4'))  # latent preview interval
+render_jobs = {}
+render_jobs_lock = threading.Lock()
+
+def create_render_job(job_id=None, kind='video', total_steps=0, total_scenes=0):
+    """Register a new render job and return it"""
+    if job_id is not None and not job_store.valid_job_id(job_id):
+        raise ValueError(f"Invalid job id: {job_id!r}")
+    now = time.time()
+    job = {
+        'id': job_id or str(uuid.uuid4()),
+        'kind': kind,
+        'status': 'running',
+        'total_steps': total_steps,
+        'completed_steps': 0,
+        'total_scenes': total_scenes,
+        'current_scene': 0,
+        'cancel_requested': False,
+        'created_at': now,
+        'updated_at': now
+    }
+    with render_jobs_lock:
+        # Drop finished jobs that have outlived their TTL
+        for stale_id in [j for j, v in render_jobs.items()
+                         if v['status'] not in ('running', 'queued') and now - v['updated_at'] > RENDER_JOB_TTL]:
+            del render_jobs[stale_id]
+        render_jobs[job['id']] = job
+    return job
+
+def update_render_job(job_id, **updates):
+    """Update fields of a render job (no-op for unknown jobs)"""
+    with render_jobs_lock:
+        job = render_jobs.get(job_id)
+        if job:
+            job.update(updates)
+            job['updated_at'] = time.time()
+        return job
+
+def is_job_cancelled(job_id):
+    with render_jobs_lock:
+        job = render_jobs.get(job_id)
+        return bool(job and job['cancel_requested'])
+
+def job_progress(job):
+    """Public view of a render job"""
+    total = job['total_steps']
+    return {
+        'job_id': job['id'],
+        'kind': job['kind'],
+        'status': job['status'],
+        'completed_steps': job['completed_steps'],
+        'total_steps': total,
+        'current_scene': job['current_scene'],
+        'total_scenes': job['total_scenes'],
+        'percent': round(100.0 * job['completed_steps'] / total, 1) if total else 0.0,
+        'cancel_requested': job['cancel_requested'],
+        'preview_step': job.get('preview_step'),
+        'updated_at': job['updated_at']
+    }
+
+def store_latent_preview(job_id, latent, step):
+    """Encode a latent preview thumbnail on the post-processing pool"""
+    try:
+        preview = latents_to_preview_jpeg(latent)
+        if preview:
+            update_render_job(job_id, preview=preview, preview_step=step)
+    except Exception as e:
+        print(f"⚠️ Preview failed for job {job_id}: {e}")
+
+def make_step_callback(job_id, preview_every=0):
+    """Build a callback_on_step_end that counts steps and aborts cancelled jobs.
+    
+    With preview_every > 0 the current latents are projected to a thumbnail
+    every preview_every steps. Only one (C, H, W) slice is copied off the GPU
+    and the JPEG encode happens on the post-processing pool.
+    """
+    def callback(pipeline, step, timestep, callback_kwargs):
+        with render_jobs_lock:
+            job = render_jobs.get(job_id)
+            if job:
+                job['completed_steps'] += 1
+                job['updated_at'] = time.time()
+                cancelled = job['cancel_requested']
+                completed = job['completed_steps']
+            else:
+                cancelled = False
+                completed = 0
+        if cancelled:
+            # Stop at this step boundary instead of finishing the loop and decoding
+            pipeline._interrupt = True
+            raise RenderCancelled(f"Render job {job_id} cancelled at step {step + 1}")
+        
+        latents = callback_kwargs.get('latents')
+        if preview_every and latents is not None and (step + 1) % preview_every == 0:
+            sample = latents[0]
+            if sample.ndim == 4:
+                # Video latents are (C, T, H, W); preview the middle frame
+                sample = sample[:, sample.shape[1] // 2]
+            sample = sample.detach().float().cpu().numpy()
+            postprocess_executor.submit(store_latent_preview, job_id, sample, completed)
+        return callback_kwargs
+    return callback
+
+def release_gpu_memory():
+    """Return cached GPU memory after an aborted render"""
+    if torch.cuda.is_available():
+        conditioning_cache.offload()
+        torch.cuda.empty_cache()
+
+# Initialize FLUX image pipeline (lazy load)
+flux_pipe = None
+flux_pipe_lock = threading.Lock()
+
+def get_flux_pipe():
+    global flux_pipe
+    if flux_pipe is None:
+        with flux_pipe_lock:
+            if flux_pipe is None:
+                print("Loading FLUX SDXL Lightning model...")
+                try:
+                    from diffusers import StableDiffusionXLPipeline, UNet2DConditionModel, EulerDiscreteScheduler
+                    from huggingface_hub import hf_hub_download
+                    from safetensors.torch import load_file
+                    
+                    base = "stabilityai/stable-diffusion-xl-base-1.0"
+                    repo = "ByteDance/SDXL-Lightning"
+                    ckpt = "sdxl_lightning_4step_unet.safetensors"
+                    
+                    device = "cuda" if torch.cuda.is_available() else "cpu"
+                    print(f"Using device: {device}")
+                    
+                    # Load model
+                    unet = UNet2DConditionModel.from_config(base, subfolder="unet")
+                    unet.load_state_dict(load_file(hf_hub_download(repo, ckpt), device=device))
+                    
+                    flux_pipe = StableDiffusionXLPipeline.from_pretrained(
+                        base, 
+                        unet=unet, 
+                        torch_dtype=torch.float16 if device == "cuda" else torch.float32,
+                        variant="fp16" if device == "cuda" else None
+                    )
+                    flux_pipe.to(device)
+                    
+                    # Ensure sampler uses "trailing" timesteps
+                    flux_pipe.scheduler = EulerDiscreteScheduler.from_config(
+                        flux_pipe.scheduler.config, 
+                        timestep_spacing="trailing"
+                    )
+                    
+                    print("✓ FLUX SDXL Lightning model loaded successfully")
+                except Exception as e:
+                    print(f"Warning: Could not load FLUX model: {e}")
+                    flux_pipe = None
+    return flux_pipe
+
+def get_render_preset(name):
+    """Resolve a render preset by name, falling back to the default preset"""
+    name = name or DEFAULT_RENDER_PRESET
+    if name not in RENDER_PRESETS:
+        print(f"⚠️ Unknown render preset '{name}', using '{DEFAULT_RENDER_PRESET}'")
+        name = DEFAULT_RENDER_PRESET
+    return name, RENDER_PRESETS[name]
+
+def render_scene_clip(pipe, img_path, prompt, preset, seed, callback=None):
+    """Render a single scene image into video frames, returns (frames, width, height).
+    
+    frames is a contiguous (T, H, W, 3) uint8 array.
+    """
+    image, width, height, digest = prepare_scene_image(pipe, img_path, preset['max_area'])
+    
+    negative_prompt = "low quality, blurry, static"
+    print(f"   📝 Prompt: {prompt}")
+    print(f"   🚫 Negative prompt: {negative_prompt}")
+    
+    print("🎬 GENERATING VIDEO CLIP...")
+    print("   ⚙️ Model parameters:")
+    print(f"   📊 Frames: {preset['num_frames']}")
+    print(f"   🎯 Guidance scale: {preset['guidance_scale']}")
+    print(f"   🔄 Inference steps: {preset['num_inference_steps']}")
+    print(f"   🎞️ FPS: {preset['fps']}")
+    print(f"   🌱 Seed: {seed}")
+    
+    configure_vae(pipe, preset.get('vae_tiling'), preset.get('vae_slicing'), preset.get('vae_tile_size'))
+    generator = torch.Generator(device=pipe.device).manual_seed(seed)
+    condition_key = (digest, width, height, preset['num_frames'], getattr(pipe, '_vae_mode', None))
+    with conditioning_cache.use(condition_key):
+        output = pipe(
+            image=image,
+            prompt=prompt,
+            negative_prompt=negative_prompt,
+            height=height,
+            width=width,
+            num_frames=preset['num_frames'],
+            guidance_scale=preset['guidance_scale'],
+            num_inference_steps=preset['num_inference_steps'],
+            generator=generator,
+            callback_on_step_end=callback,
+            output_type='np'
+        ).frames[0]
+    
+    # One contiguous uint8 buffer is a quarter of the float frames and is what
+    # every later stage (interpolation, upscaling, encoding, sampling) reads
+    frames = to_uint8_array(output)
+    del output
+    print("✅ Video generation completed successfully!")
+    print(f"   🎞️ Generated frames: {len(frames)} ({frames.nbytes / 1024 / 1024:.1f} MB uint8 buffer)")
+    return frames, width, height
+
+def finish_scene_clip(frames, clip_path, fps, output_fps=None, output_size=None):
+    """Interpolate and upscale (optionally) and encode a clip; runs on the post-processing pool"""
+    if output_fps and output_fps > fps:
+        start = time.time()
+        frames = interpolate_frames(frames, fps, output_fps)
+        print(f"   🎞️ Interpolated {clip_path} to {output_fps} fps ({len(frames)} frames, {time.time() - start:.1f}s)")
+        fps = output_fps
+    
+    # Upscale after interpolation so optical flow runs at the smaller size
+    if output_size:
+        start = time.time()
+        frames = upscale_frames(frames, output_size, UPSCALE_METHOD)
+        print(f"   🔍 Upscaled {clip_path} to {output_size[0]}x{output_size[1]} with {UPSCALE_METHOD} ({time.time() - start:.1f}s)")
+    
+    export_frames(to_uint8_array(frames), clip_path, fps=fps)
+    file_size = os.path.getsize(clip_path)
+    print(f"💾 Exported clip: {clip_path} ({file_size/1024:.1f} KB)")
+    return clip_path
+
+def local_image_path(img_path):
+    """Map a '/static/...' URL from the frontend to the file on disk"""
+    if img_path.startswith('/static/') and not os.path.exists(img_path):
+        return img_path.lstrip('/')
+    return img_path
+
+def generate_scene_image(prompt, negative_prompt, image_path, job_id=None, previews=False, user=None):
+    """Render a scene image with SDXL Lightning and save it to image_path.
+    
+    Falls back to a placeholder image when the model is unavailable or fails.
+    Returns a dict with the job id, whether a placeholder was used and the
+    URLs of the image's derivatives (written shortly after by the derivative pool).
+    Images are scheduled on the GPU as 'preview' work; raises QueueFull when
+    the user or the queue is at its limit.
+    """
+    job_id = job_id or str(uuid.uuid4())
+    gpu_scheduler.admit(job_id, user or 'anonymous', 'preview')
+    try:
+        return _generate_scene_image(prompt, negative_prompt, image_path, job_id, previews)
+    finally:
+        gpu_scheduler.release(job_id)
+
+def _generate_scene_image(prompt, negative_prompt, image_path, job_id, previews):
+    print("🤖 INITIALIZING AI IMAGE GENERATION...")
+    print("   🔗 Loading SDXL Lightning model...")
+    sdxl_pipe = get_sdxl_pipe()
+    job = create_render_job(job_id, kind='image', total_steps=4, total_scenes=1)
+    placeholder = False
+    
+    if sdxl_pipe:
+        print("✅ SDXL Lightning model loaded successfully")
+        try:
+            print("   ⚙️ Model parameters:")
+            print("   📊 Inference steps: 4")
+            print("   🎯 Guidance scale: 0")
+            print(f"   🖼️ Render resolution: {IMAGE_RENDER_SIZE}x{IMAGE_RENDER_SIZE}")
+            print(f"   🖼️ Output resolution: {IMAGE_OUTPUT_SIZE}x{IMAGE_OUTPUT_SIZE}")
+            
+            update_render_job(job['id'], status='queued')
+            with gpu_scheduler.slot(job['id'], lambda: is_job_cancelled(job['id'])):
+                update_render_job(job['id'], status='running')
+                result = sdxl_pipe(
+                    prompt, 
+                    negative_prompt=negative_prompt,
+                    num_inference_steps=4, 
+                    guidance_scale=0,
+                    height=IMAGE_RENDER_SIZE,
+                    width=IMAGE_RENDER_SIZE,
+                    callback_on_step_end=make_step_callback(job['id'], 1 if previews else 0)
+                )
+            
+            print("✅ AI image generation completed successfully!")
+            generated_image = result.images[0]
+            print(f"🖼️ Generated image size: {generated_image.size}")
+            save_scene_image(generated_image, image_path)
+            
+        except RenderCancelled:
+            update_render_job(job['id'], status='cancelled')
+            release_gpu_memory()
+            raise
+        except Exception as e:
+            print(f"❌ SDXL Lightning generation failed: {e}")
+            placeholder = True
+    else:
+        print("❌ SDXL Lightning model not available")
+        placeholder = True
+    
+    if placeholder:
+        save_placeholder_image(image_path)
+    
+    update_render_job(job['id'], status='completed', completed_steps=job['total_steps'])
+    return {'job_id': job['id'], 'placeholder': placeholder, 'variants': image_variants(image_path)}
+
+def save_scene_image(generated_image, image_path):
+    """Upscale a generated image to IMAGE_OUTPUT_SIZE if needed and save it"""
+    if IMAGE_OUTPUT_SIZE > IMAGE_RENDER_SIZE:
+        output_size = (IMAGE_OUTPUT_SIZE, IMAGE_OUTPUT_SIZE)
+        generated_image = Image.fromarray(upscale_frames([generated_image], output_size, UPSCALE_METHOD)[0])
+        print(f"🔍 Upscaled image to {generated_image.size} with {UPSCALE_METHOD}")
+    
+    print(f"💾 SAVING IMAGE TO DISK...")
+    generated_image.save(image_path)
+    print(f"✅ Image saved successfully to: {image_path}")
+    submit_derivatives(image_path, generated_image)
+
+def save_placeholder_image(image_path):
+    print("🔄 FALLBACK: Creating placeholder image...")
+    img = Image.new('RGB', (1024, 1024), color=(73, 109, 137))
+    img.save(image_path)
+    print(f"✅ Placeholder image created: {image_path}")
+    submit_derivatives(image_path, img)
+
+def image_variants(image_path):
+    """URLs the derivatives of a saved scene image will have once the pool has written them"""
+    image_url = image_path if image_path.startswith('/') else f"/{image_path}"
+    return variant_urls(image_url, supported_formats())
+
+def generate_scene_images(prompts, negative_prompts, image_paths, job_id=None, user=None, batch_size=None):
+    """Render many scene images in batched SDXL calls (one GPU slot per batch).
+    
+    Used by batch_render.py to fill the GPU with images from several movies.
+    Images that fail get a placeholder. Returns a dict with the job id and
+    the list of placeholder flags in input order.
+    """
+    batch_size = batch_size or IMAGE_BATCH_SIZE
+    job_id = job_id or str(uuid.uuid4())
+    num_batches = (len(prompts) + batch_size - 1) // batch_size
+    gpu_scheduler.admit(job_id, user or 'anonymous', 'preview')
+    try:
+        job = create_render_job(job_id, kind='image', total_steps=4 * num_batches, total_scenes=len(prompts))
+        placeholders = [True] * len(prompts)
+        sdxl_pipe = get_sdxl_pipe()
+        
+        for batch, start in enumerate(range(0, len(prompts), batch_size)):
+            end = min(start + batch_size, len(prompts))
+            if sdxl_pipe:
+                print(f"🎨 IMAGE BATCH {batch + 1}/{num_batches}: {end - start} images")
+                try:
+                    with gpu_scheduler.slot(job_id, lambda: is_job_cancelled(job_id)):
+                        update_render_job(job_id, status='running', current_scene=start + 1)
+                        result = sdxl_pipe(
+                            prompts[start:end],
+                            negative_prompt=negative_prompts[start:end],
+                            num_inference_steps=4,
+                            guidance_scale=0,
+                            height=IMAGE_RENDER_SIZE,
+                            width=IMAGE_RENDER_SIZE,
+                            callback_on_step_end=make_step_callback(job_id)
+                        )
+                    for offset, generated_image in enumerate(result.images):
+                        save_scene_image(generated_image, image_paths[start + offset])
+                        placeholders[start + offset] = False
+                except RenderCancelled:
+                    update_render_job(job_id, status='cancelled')
+                    release_gpu_memory()
+                    raise
+                except Exception as e:
+                    print(f"❌ SDXL Lightning batch failed: {e}")
+            for index in range(start, end):
+                if placeholders[index]:
+                    save_placeholder_image(image_paths[index])
+    finally:
+        gpu_scheduler.release(job_id)
+    
+    update_render_job(job_id, status='completed', completed_steps=job['total_steps'])
+    return {'job_id': job_id, 'placeholders': placeholders}
+
+def generate_poster_art(prompt, negative_prompt, image_paths, job_id=None, user=None):
+    """Render len(image_paths) portrait poster candidates in one batched SDXL call.
+    
+    Only used when a movie has no scene image to compose its poster from.
+    The candidates are plain JPEGs without derivatives; the caller composes
+    the poster from the best one and removes them. Returns a dict with the
+    job id and the paths written (empty when the model is unavailable).
+    """
+    job_id = job_id or str(uuid.uuid4())
+    gpu_scheduler.admit(job_id, user or 'anonymous', 'preview')
+    written = []
+    try:
+        job = create_render_job(job_id, kind='image', total_steps=4, total_scenes=1)
+        sdxl_pipe = get_sdxl_pipe()
+        if sdxl_pipe:
+            width, height = POSTER_RENDER_SIZE
+            print(f"🎨 POSTER ART: {len(image_paths)} candidates at {width}x{height}")
+            try:
+                with gpu_scheduler.slot(job_id, lambda: is_job_cancelled(job_id)):
+                    update_render_job(job_id, status='running')
+                    result = sdxl_pipe(
+                        [prompt] * len(image_paths),
+                        negative_prompt=[negative_prompt] * len(image_paths),
+                        num_inference_steps=4,
+                        guidance_scale=0,
+                        height=height,
+                        width=width,
+                        callback_on_step_end=make_step_callback(job_id)
+                    )
+                for generated_image, image_path in zip(result.images, image_paths):
+                    generated_image.save(image_path)
+                    written.append(image_path)
+            except RenderCancelled:
+                update_render_job(job_id, status='cancelled')
+                release_gpu_memory()
+                raise
+            except Exception as e:
+                print(f"❌ Poster art generation failed: {e}")
+        else:
+            print("❌ SDXL Lightning model not available for poster art")
+    finally:
+        gpu_scheduler.release(job_id)
+    
+    update_render_job(job_id, status='completed', completed_steps=job['total_steps'])
+    return {'job_id': job_id, 'images': written}
+
+def concatenate_clips(video_clips, final_path):
+    """Concatenate scene clips and encode them into final_path, returns the final clip"""
+    print(f"🔗 CONCATENATING VIDEO CLIPS...")
+    print(f"   📹 Loading {len(video_clips)} video clips...")
+    clips = [VideoFileClip(clip) for clip in video_clips]
+    print(f"   ✅ Loaded {len(clips)} video clips for concatenation")
+    
+    print("🎬 CREATING FINAL VIDEO...")
+    final_video = concatenate_videoclips(clips)
+    print(f"   📁 Target file: {final_path}")
+    print(f"   ⏱️ Duration: {final_video.duration:.2f} seconds")
+    
+    print("💾 WRITING FINAL VIDEO TO DISK...")
+    final_video.write_videofile(final_path, codec='libx264', audio=False)
+    return final_video
+
+def describe_video(final_video, final_path, total_clips, width=None, height=None):
+    """video_info of a movie record for a freshly concatenated video"""
+    final_size = os.path.getsize(final_path)
+    return {
+        'duration_seconds': final_video.duration,
+        'file_size_bytes': final_size,
+        'file_size_mb': round(final_size / 1024 / 1024, 1),
+        'total_clips': total_clips,
+        'resolution': f"{final_video.w}x{final_video.h}",
+        'render_resolution': f"{width}x{height}" if width else None
+    }
+
+def scene_clip_path(movie_id, scene_index):
+    """New path for a kept scene clip; every revision gets its own name, so
+    clips are never overwritten and can be cached as immutable"""
+    return os.path.join(SCENE_CLIP_DIR, f"{movie_id}_clip_{scene_index}_{uuid.uuid4().hex[:8]}.mp4")
+
+def keep_scene_clips(finished_clips, total_scenes, movie_id):
+    """Move finished clips out of the job workspace, returns clip paths per scene (None if failed)"""
+    os.makedirs(SCENE_CLIP_DIR, exist_ok=True)
+    clips = [None] * total_scenes
+    for idx, clip_path in finished_clips.items():
+        kept_path = scene_clip_path(movie_id, idx)
+        shutil.move(clip_path, kept_path)
+        clips[idx] = kept_path
+    return clips
+
+def write_movie_artifacts(clip_paths, samples, video_path):
+    """History artifacts of a movie from its scene samples (scene index ->
+    future or sample), sampling the clip file of any scene without one.
+    Returns their URLs, or None if they could not be written.
+    """
+    try:
+        scene_samples = []
+        for idx in sorted(clip_paths):
+            sample = samples.get(idx)
+            if hasattr(sample, 'result'):
+                try:
+                    sample = sample.result()
+                except Exception as e:
+                    print(f"⚠️ Frame sampling failed for scene {idx + 1}: {e}")
+                    sample = None
+            scene_samples.append(sample or sample_clip_frames(clip_paths[idx]))
+        return build_movie_artifacts(scene_samples, video_path)
+    except Exception as e:
+        print(f"⚠️ History artifacts failed for {video_path}: {e}")
+        return None
+
+def clip_durations(clip_paths):
+    durations = []
+    for path in clip_paths:
+        clip = VideoFileClip(path)
+        durations.append(clip.duration)
+        clip.close()
+    return durations
+
+def start_narration(movie, preset):
+    """Start synthesizing a movie's narration next to the render, returns
+    (voice, one future or None per scene) or None when narration is off"""
+    if not NARRATION_ENABLED or not movie.get('scenes'):
+        return None
+    voice = (movie.get('narration') or {}).get('voice') or NARRATION_VOICE
+    return voice, submit_narration(movie['scenes'], voice, preset['num_frames'] / preset['fps'])
+
+def collect_narration(narration):
+    """Wait for the synthesis started by start_narration, returns (voice, audio
+    path or None per scene) or None"""
+    if not narration:
+        return None
+    voice, futures = narration
+    audio = []
+    for idx, future in enumerate(futures):
+        try:
+            audio.append(future.result() if future else None)
+        except Exception as e:
+            print(f"⚠️ Narration failed for scene {idx + 1}: {e}")
+            audio.append(None)
+    return voice, audio
+
+def narrate_video(final_path, clip_paths, narration):
+    """Mux the collected narration of each clip's scene (clip_paths: scene
+    index -> clip) into final_path, returns the narration record or None"""
+    if not narration:
+        return None
+    voice, audio = narration
+    try:
+        audio_paths = [audio[idx] if idx < len(audio) else None for idx in sorted(clip_paths)]
+        durations = clip_durations([clip_paths[idx] for idx in sorted(clip_paths)])
+        narrated = attach_narration(final_path, durations, audio_paths)
+        return {'voice': voice, 'scenes': narrated} if narrated else None
+    except Exception as e:
+        print(f"⚠️ Narration skipped for {final_path}: {e}")
+        return None
+
+def upload_movie_video(movie, final_path):
+    """Hand a saved movie's video to storage; uploads run on the storage pool and
+    the video is served from the local file until the upload finishes"""
+    storage = get_storage()
+    
+    def record_upload(key, error, movie_id=movie['id']):
+        update_movie(movie_id, {'upload_status': 'failed' if error else 'uploaded'})
+    storage.upload_async(final_path, movie['video_key'],
+                         on_done=record_upload if storage.name != 'local' else None)
+
+def render_video(scene_images, prompt, preset_name, final_path, seeds=None, output_fps=None, job_id=None, previews=False, movie_record=None, user=None):
+    """Admit a render job to the GPU scheduler and render it (see _render_video).
+    
+    Raises QueueFull when the user or the whole queue is at its limit. Draft
+    renders are scheduled as 'preview' work, full renders as 'final'.
+    """
+    job_id = job_id or str(uuid.uuid4())
+    priority = get_render_preset(preset_name)[1].get('priority', 'final')
+    gpu_scheduler.admit(job_id, user or 'anonymous', priority)
+    try:
+        return _render_video(scene_images, prompt, preset_name, final_path, seeds, output_fps,
+                             job_id, previews, movie_record, user)
+    finally:
+        gpu_scheduler.release(job_id)
+
+def _render_video(scene_images, prompt, preset_name, final_path, seeds, output_fps, job_id, previews, movie_record, user):
+    """Render every scene into a clip and concatenate them into final_path.
+    
+    Returns render details (preset, seeds, video_info and the saved movie
+    record), or None when no clip could be rendered. Seeds default to the
+    scene index so a draft and its promoted render match. Clip
+    interpolation/encoding is handed to the post-processing pool so the GPU
+    can move straight on to the next scene. Progress is reported on the render
+    job; RenderCancelled is raised if the job is cancelled.
+    
+    The job and a checkpoint per scene are persisted in job_store. Calling
+    this again with the id of an unfinished job skips scenes whose clips are
+    already done. Clips are written to the job's own scratch workspace, which
+    is removed once the job ends.
+    """
+    preset_name, preset = get_render_preset(preset_name)
+    output_fps = output_fps or preset.get('output_fps')
+    if output_fps and output_fps not in INTERPOLATION_FPS_OPTIONS:
+        print(f"⚠️ Unsupported output fps {output_fps}, skipping interpolation")
+        output_fps = None
+    seeds = list(seeds) if seeds else list(range(len(scene_images)))
+    
+    print(f"   🎚️ Render preset: {preset_name}")
+    print(f"   🎞️ Output FPS: {output_fps or preset['fps']}")
+    
+    job = create_render_job(
+        job_id,
+        kind='video',
+        total_steps=len(scene_images) * preset['num_inference_steps'],
+        total_scenes=len(scene_images)
+    )
+    job_id = job['id']
+    callback = make_step_callback(job_id, PREVIEW_EVERY_N_STEPS if previews else 0)
+    print(f"   🧾 Render job: {job_id}")
+    workspace = job_store.job_workspace(job_id)
+    # Narration is synthesized on its own pool while the GPU renders the clips
+    narration = start_narration(movie_record, preset) if movie_record else None
+    
+    stored_job = job_store.load_job(job_id)
+    if stored_job is None:
+        stored_job = job_store.create_job(job_id, {
+            'scene_images': scene_images,
+            'prompt': prompt,
+            'preset_name': preset_name,
+            'final_path': final_path,
+            'seeds': seeds,
+            'output_fps': output_fps,
+            'previews': previews,
+            'movie_record': movie_record,
+            'user': user
+        }, len(scene_images))
+    else:
+        print(f"   ♻️ Resuming persisted job {job_id}")
+    job_store.update_job(job_id, status='rendering')
+    
+    def checkpoint(idx, future):
+        if future.cancelled():
+            return
+        if future.exception() is None:
+            job_store.update_scene(job_id, idx, status='done', clip_path=future.result())
+        else:
+            job_store.update_scene(job_id, idx, status='failed')
+    
+    # Generate video clips for each scene
+    print(f"🎬 INITIATING VIDEO GENERATION...")
+    print(f"   📊 Processing {len(scene_images)} scene images")
+    pending_clips = []
+    finished_clips = {}
+    scene_samples = {}
+    width = height = None
+    
+    for idx, img_path in enumerate(scene_images):
+        if is_job_cancelled(job_id):
+            break
+        
+        checkpointed = stored_job['scenes'][idx]
+        if checkpointed['status'] == 'done' and checkpointed['clip_path'] and os.path.exists(checkpointed['clip_path']):
+            print(f"⏭️ Scene {idx + 1} already rendered: {checkpointed['clip_path']}")
+            finished_clips[idx] = checkpointed['clip_path']
+            continue
+        
+        try:
+            update_render_job(job_id, current_scene=idx + 1, completed_steps=idx * preset['num_inference_steps'])
+            job_store.update_scene(job_id, idx, status='rendering')
+            print(f"🎬 ===== PROCESSING SCENE {idx + 1}/{len(scene_images)} =====")
+            print(f"   📸 Image path: {img_path}")
+            
+            seed = seeds[idx] if idx < len(seeds) else idx
+            clip_path = os.path.join(workspace, f"clip_{idx}.mp4")
+            
+            # Wait for this job's turn on the GPU; other jobs can run between scenes
+            update_render_job(job_id, status='queued')
+            with gpu_scheduler.slot(job_id, lambda: is_job_cancelled(job_id)):
+                update_render_job(job_id, status='running')
+                print("🤖 LOADING VIDEO GENERATION MODEL...")
+                pipe = get_video_pipe()
+                print("✅ Wan video model loaded successfully")
+                frames, width, height = render_scene_clip(pipe, local_image_path(img_path), prompt, preset, seed, callback)
+            output_size = None
+            if preset.get('output_area') and preset['output_area'] > width * height:
+                output_size = scaled_size(width, height, preset['output_area'])
+            
+            print(f"✅ Scene {idx + 1} frames ready, handing off to post-processing")
+            future = postprocess_executor.submit(
+                finish_scene_clip, frames, clip_path, preset['fps'], output_fps, output_size
+            )
+            future.add_done_callback(lambda f, idx=idx: checkpoint(idx, f))
+            pending_clips.append((idx, future))
+            if movie_record:
+                # Sample the history artifacts while the frames are still in memory
+                scene_samples[idx] = postprocess_executor.submit(sample_scene_frames, frames, preset['fps'])
+        
+        except RenderCancelled as e:
+            print(f"🛑 {e}")
+            job_store.update_scene(job_id, idx, status='pending')
+            break
+        except Exception as e:
+            print(f"❌ VIDEO GENERATION FAILED FOR SCENE {idx + 1}")
+            print(f"   🚨 Error: {str(e)}")
+            print(f"   📊 Error type: {type(e).__name__}")
+            print("   ⏭️ Continuing with next scene...")
+            job_store.update_scene(job_id, idx, status='failed')
+            continue
+    
+    if is_job_cancelled(job_id):
+        for idx, future in pending_clips:
+            future.cancel()
+        for future in scene_samples.values():
+            future.cancel()
+        release_gpu_memory()
+        shutil.rmtree(workspace, ignore_errors=True)
+        update_render_job(job_id, status='cancelled')
+        job_store.update_job(job_id, status='cancelled')
+        print(f"🛑 RENDER CANCELLED: job {job_id}")
+        raise RenderCancelled(f"Render job {job_id} cancelled")
+    
+    for idx, future in pending_clips:
+        try:
+            finished_clips[idx] = future.result()
+        except Exception as e:
+            print(f"❌ POST-PROCESSING FAILED FOR SCENE {idx + 1}: {e}")
+    video_clips = [finished_clips[idx] for idx in sorted(finished_clips)]
+    
+    print(f"📊 VIDEO GENERATION SUMMARY:")
+    print(f"   ✅ Successful clips: {len(video_clips)}")
+    print(f"   ❌ Failed clips: {len(scene_images) - len(video_clips)}")
+    
+    if not video_clips:
+        shutil.rmtree(workspace, ignore_errors=True)
+        update_render_job(job_id, status='failed')
+        job_store.update_job(job_id, status='failed')
+        return None
+    
+    # Any failure from here on marks the job failed, so a restart does not
+    # render it again (and save a second copy of the movie)
+    try:
+        final_video = concatenate_clips(video_clips, final_path)
+        narrated = narrate_video(final_path, finished_clips, collect_narration(narration))
+        video_info = describe_video(final_video, final_path, len(video_clips), width, height)
+        print(f"✅ FINAL VIDEO CREATED SUCCESSFULLY!")
+        print(f"   📁 File: {final_path}")
+        print(f"   📊 Size: {video_info['file_size_bytes']} bytes ({video_info['file_size_mb']:.1f} MB)")
+        print(f"   ⏱️ Duration: {final_video.duration:.2f} seconds")
+        
+        artifacts = None
+        if movie_record:
+            artifacts = write_movie_artifacts(finished_clips, scene_samples, final_path)
+        
+        clips = None
+        if movie_record and KEEP_SCENE_CLIPS:
+            clips = keep_scene_clips(finished_clips, len(scene_images), movie_record['id'])
+        
+        # Clean up the job workspace with its individual clips
+        print(f"🧹 CLEANING UP WORKSPACE {workspace}...")
+        shutil.rmtree(workspace, ignore_errors=True)
+        
+        render = {
+            'job_id': job_id,
+            'preset': preset_name,
+            'seeds': seeds[:len(scene_images)],
+            'output_fps': output_fps,
+            'video_info': video_info,
+            'movie': None
+        }
+        
+        if movie_record:
+            # Save movie to history
+            print("💾 SAVING MOVIE TO HISTORY...")
+            movie = dict(movie_record)
+            movie.update({key: render[key] for key in ('preset', 'seeds', 'output_fps', 'video_info')})
+            if clips:
+                movie['clips'] = clips
+            if artifacts:
+                movie['artifacts'] = artifacts
+            if narrated:
+                movie['narration'] = narrated
+            movie['image_variants'] = [existing_variants(image) for image in movie.get('images') or []]
+            if get_storage().name != 'local':
+                movie['upload_status'] = 'uploading'
+            if save_movie(movie):
+                print(f"✅ Movie saved to history: {movie['title']}")
+            else:
+                print(f"⚠️ Failed to save movie to history")
+            render['movie'] = movie
+        
+            if movie.get('video_key'):
+                upload_movie_video(movie, final_path)
+        
+    except Exception:
+        shutil.rmtree(workspace, ignore_errors=True)
+        update_render_job(job_id, status='failed')
+        job_store.update_job(job_id, status='failed')
+        raise
+    
+    update_render_job(job_id, status='completed', completed_steps=job['total_steps'])
+    job_store.update_job(job_id, status='done', movie_id=movie_record['id'] if movie_record else None)
+    return render
+
+def render_scene(movie_id, scene_index, seed, final_path, video_key, video_url, job_id=None, previews=False, user=None):
+    """Re-render one scene clip of a saved movie and rebuild its video (see _render_scene).
+    
+    Raises QueueFull when the user or the whole queue is at its limit.
+    """
+    movie = next((m for m in load_movies() if m.get('id') == movie_id), None)
+    if movie is None:
+        raise ValueError(f"Movie {movie_id} not found")
+    job_id = job_id or str(uuid.uuid4())
+    priority = get_render_preset(movie.get('preset'))[1].get('priority', 'final')
+    gpu_scheduler.admit(job_id, user or 'anonymous', priority)
+    try:
+        return _render_scene(movie, scene_index, seed, final_path, video_key, video_url, job_id, previews)
+    finally:
+        gpu_scheduler.release(job_id)
+
+def _render_scene(movie, scene_index, seed, final_path, video_key, video_url, job_id, previews):
+    """Render scene_index of movie with seed, then concatenate it with the
+    movie's stored clips of the other scenes into final_path.
+    
+    The other scenes are not rendered again and keep their seeds. The movie
+    record is updated in place (clip, seed, video paths, video_info and
+    history artifacts) and its previous clip and video are deleted. Returns
+    {'job_id', 'movie'}; raises ValueError if the movie has no stored clips
+    and RenderCancelled if the job is cancelled.
+    """
+    movie_id = movie['id']
+    images = movie.get('images') or []
+    clips = movie.get('clips') or []
+    if not 0 <= scene_index < len(images):
+        raise ValueError(f"Movie {movie_id} has no scene {scene_index + 1}")
+    if len(clips) != len(images):
+        raise ValueError(f"Movie {movie_id} has no stored scene clips; render it again first")
+    
+    preset_name, preset = get_render_preset(movie.get('preset'))
+    output_fps = movie.get('output_fps')
+    prompt = f"{movie.get('description', 'Cinematic scene')}"
+    job = create_render_job(job_id, kind='video', total_steps=preset['num_inference_steps'], total_scenes=1)
+    callback = make_step_callback(job_id, PREVIEW_EVERY_N_STEPS if previews else 0)
+    workspace = job_store.job_workspace(job_id)
+    os.makedirs(workspace, exist_ok=True)
+    # Narrated movies are narrated again; unchanged scenes come from the TTS cache
+    narration = start_narration(movie, preset) if movie.get('narration') else None
+    print(f"🔁 RE-RENDERING SCENE {scene_index + 1} OF {movie.get('title', movie_id)} (seed {seed})")
+    
+    try:
+        update_render_job(job_id, current_scene=1, status='queued')
+        with gpu_scheduler.slot(job_id, lambda: is_job_cancelled(job_id)):
+            update_render_job(job_id, status='running')
+            pipe = get_video_pipe()
+            frames, width, height = render_scene_clip(
+                pipe, local_image_path(images[scene_index]), prompt, preset, seed, callback
+            )
+        if is_job_cancelled(job_id):
+            raise RenderCancelled(f"Render job {job_id} cancelled")
+        
+        output_size = None
+        if preset.get('output_area') and preset['output_area'] > width * height:
+            output_size = scaled_size(width, height, preset['output_area'])
+        new_sample = postprocess_executor.submit(sample_scene_frames, frames, preset['fps'])
+        new_clip = finish_scene_clip(
+            frames, os.path.join(workspace, f"clip_{scene_index}.mp4"), preset['fps'], output_fps, output_size
+        )
+        # Wait for TTS here, not while holding the movie's edit lock
+        narration = collect_narration(narration)
+        
+        with movie_edit_lock(movie_id):
+            # Re-read the record so concurrent edits of other scenes are kept
+            current = next((m for m in load_movies() if m.get('id') == movie_id), None)
+            if current is None:
+                raise ValueError(f"Movie {movie_id} was deleted during the render")
+            clip_path = scene_clip_path(movie_id, scene_index)
+            shutil.move(new_clip, clip_path)
+            clips = list(current['clips'])
+            old_clip = clips[scene_index]
+            clips[scene_index] = clip_path
+            final_video = concatenate_clips([clip for clip in clips if clip], final_path)
+            narrated = narrate_video(final_path, {idx: clip for idx, clip in enumerate(clips) if clip}, narration)
+            video_info = describe_video(final_video, final_path, sum(1 for clip in clips if clip), width, height)
+            artifacts = write_movie_artifacts(
+                {idx: clip for idx, clip in enumerate(clips) if clip}, {scene_index: new_sample}, final_path
+            )
+            old_video_key = current.get('video_key')
+            
+            def apply(record):
+                seeds = list(record.get('seeds') or range(len(images)))
+                seeds += list(range(len(seeds), len(images)))
+                seeds[scene_index] = seed
+                record.update({
+                    'clips': clips,
+                    'seeds': seeds,
+                    'video_path': final_path,
+                    'video_key': video_key,
+                    'video_url': video_url,
+                    'video_info': video_info,
+                    'updated_at': time.time()
+                })
+                if artifacts:
+                    record['artifacts'] = artifacts
+                # A failed TTS or mux keeps the previous record (and voice), so
+                # later edits of the movie are still narrated
+                if narrated:
+                    record['narration'] = narrated
+                if get_storage().name != 'local':
+                    record['upload_status'] = 'uploading'
+            updated = modify_movie(movie_id, apply)
+        
+        if updated is None:
+            raise RuntimeError(f"Failed to update movie {movie_id}")
+        if old_video_key and old_video_key != video_key:
+            get_storage().delete(old_video_key)
+        if old_clip and old_clip != clip_path and os.path.exists(old_clip):
+            os.remove(old_clip)
+        upload_movie_video(updated, final_path)
+    except RenderCancelled:
+        release_gpu_memory()
+        update_render_job(job_id, status='cancelled')
+        print(f"🛑 SCENE RE-RENDER CANCELLED: job {job_id}")
+        raise
+    except Exception:
+        update_render_job(job_id, status='failed')
+        raise
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+    
+    update_render_job(job_id, status='completed', completed_steps=job['total_steps'])
+    print(f"✅ Scene {scene_index + 1} re-rendered, movie rebuilt: {final_path}")
+    return {'job_id': job_id, 'movie': updated}
+
+def resume_unfinished_jobs():
+    """Resume persisted jobs interrupted by a restart, one after another in the background.
+    
+    Returns the number of jobs queued for resumption.
+    """
+    jobs = job_store.list_unfinished_jobs()
+    if not jobs:
+        return 0
+    
+    def resume_all():
+        for stored_job in jobs:
+            done = sum(1 for scene in stored_job['scenes'] if scene['status'] == 'done')
+            print(f"♻️ RESUMING JOB {stored_job['id']}: {done}/{len(stored_job['scenes'])} scenes already done")
+            try:
+                render_video(job_id=stored_job['id'], **stored_job['request'])
+            except RenderCancelled:
+                pass
+            except Exception as e:
+                print(f"❌ Resumed job {stored_job['id']} failed: {e}")
+                job_store.update_job(stored_job['id'], status='failed', error=str(e))
+    
+    threading.Thread(target=resume_all, name='resume-jobs', daemon=True).start()
+    return len(jobs)
+
+def get_job_progress(job_id):
+    """Public progress of a render job, or None if unknown"""
+    with render_jobs_lock:
+        job = render_jobs.get(job_id)
+        progress = job_progress(job) if job else None
+    if progress:
+        # Asked outside render_jobs_lock so it is never nested with the scheduler lock
+        progress['queue_position'] = gpu_scheduler.queue_position(job_id)
+    return progress
+
+def get_job_preview(job_id):
+    """Latest preview JPEG bytes of a render job, or None"""
+    with render_jobs_lock:
+        job = render_jobs.get(job_id)
+        return job.get('preview') if job else None
+
+def cancel_job(job_id):
+    """Request cancellation of a render job, returns False if unknown"""
+    job = update_render_job(job_id, cancel_requested=True)
+    if job:
+        print(f"🛑 CANCEL REQUESTED: job {job_id}")
+    return job is not None
+
+def model_status():
+    """Which pipelines are loaded and on what device"""
+    return {
+        'device': DEVICE,
+        'cpu_mode': {
+            'threads': CPU_THREADS_USED,
+            'backend': CPU_BACKEND,
+            'quantized': CPU_QUANTIZE,
+            'video_model': VIDEO_MODEL
+        } if CPU_MODE else None,
+        'sdxl_loaded': sdxl_pipe is not None,
+        'video_pipe_loaded': video_pipe is not None,
+        'conditioning_cache': conditioning_cache.stats(),
+        'gpu_queue': gpu_scheduler.stats()
+    }
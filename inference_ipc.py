@@ -0,0 +1,57 @@
+"""
+Lightweight IPC layer between web workers and the inference daemon.
+Importing this module never loads torch or the diffusion pipelines, so web
+workers can talk to inference_server.py without paying for them.
+"""
+
+import os
+from multiprocessing.connection import Client
+
+INFERENCE_SOCKET = os.getenv('INFERENCE_SOCKET', 'data/inference.sock')
+INFERENCE_AUTHKEY = os.getenv('INFERENCE_AUTHKEY', 'movie-inference').encode()
+
+
+class RenderCancelled(Exception):
+    """Raised when a render job is cancelled before it finishes"""
+    pass
+
+
+class QueueFull(Exception):
+    """Raised when the GPU queue cannot accept another job (HTTP 429)"""
+    pass
+
+
+class InferenceError(Exception):
+    """Raised when the inference daemon reports a failure"""
+    pass
+
+
+class InferenceClient:
+    """Calls inference functions in the daemon as if they were local.
+
+    Every call opens a short-lived Unix socket connection, so one client can
+    be shared by all request threads of a web worker.
+    """
+
+    def __init__(self, address=INFERENCE_SOCKET, authkey=INFERENCE_AUTHKEY):
+        self.address = address
+        self.authkey = authkey
+
+    def call(self, op, *args, **kwargs):
+        with Client(self.address, family='AF_UNIX', authkey=self.authkey) as conn:
+            conn.send((op, args, kwargs))
+            status, payload = conn.recv()
+
+        if status == 'ok':
+            return payload
+        error_type, message = payload
+        if error_type == 'RenderCancelled':
+            raise RenderCancelled(message)
+        if error_type == 'QueueFull':
+            raise QueueFull(message)
+        raise InferenceError(f"{error_type}: {message}")
+
+    def __getattr__(self, op):
+        if op.startswith('_'):
+            raise AttributeError(op)
+        return lambda *args, **kwargs: self.call(op, *args, **kwargs)
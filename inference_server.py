@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Inference daemon for the AI Movie Generator.
+Owns the GPU and the loaded pipelines and serves web workers over a local
+Unix socket, so several lightweight gunicorn workers share one set of models:
+
+    python inference_server.py --preload
+    INFERENCE_MODE=remote gunicorn -w 4 -b 0.0.0.0:8080 app:app
+"""
+
+import os
+import argparse
+import threading
+from multiprocessing.connection import Listener, AuthenticationError
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import inference
+from inference_ipc import INFERENCE_SOCKET, INFERENCE_AUTHKEY
+
+# Only these inference functions can be called over the socket
+EXPOSED_OPERATIONS = (
+    'generate_scene_image',
+    'generate_scene_images',
+    'generate_poster_art',
+    'render_video',
+    'render_scene',
+    'get_job_progress',
+    'get_job_preview',
+    'cancel_job',
+    'model_status'
+)
+
+
+def handle_connection(conn):
+    """Serve requests from one client connection until it closes"""
+    with conn:
+        while True:
+            try:
+                op, args, kwargs = conn.recv()
+            except (EOFError, OSError):
+                break
+
+            if op not in EXPOSED_OPERATIONS:
+                conn.send(('error', ('ValueError', f"Unknown operation '{op}'")))
+                continue
+
+            try:
+                result = getattr(inference, op)(*args, **kwargs)
+                conn.send(('ok', result))
+            except Exception as e:
+                print(f"❌ Inference operation '{op}' failed: {e}")
+                conn.send(('error', (type(e).__name__, str(e))))
+
+
+def serve(address=INFERENCE_SOCKET, authkey=INFERENCE_AUTHKEY):
+    """Accept web worker connections forever, one thread per connection"""
+    os.makedirs(os.path.dirname(address) or '.', exist_ok=True)
+    if os.path.exists(address):
+        os.remove(address)
+
+    listener = Listener(address, family='AF_UNIX', authkey=authkey)
+    os.chmod(address, 0o600)
+    print(f"🧠 Inference server listening on {address}")
+
+    try:
+        while True:
+            try:
+                conn = listener.accept()
+            except AuthenticationError as e:
+                print(f"⚠️ Rejected inference client: {e}")
+                continue
+            threading.Thread(target=handle_connection, args=(conn,), daemon=True).start()
+    finally:
+        listener.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AI Movie Generator inference server')
+    parser.add_argument('--socket', default=INFERENCE_SOCKET, help='Unix socket path')
+    parser.add_argument('--preload', action='store_true', help='Load the image and video pipelines before serving')
+    args = parser.parse_args()
+
+    if args.preload:
+        print("🤖 Preloading pipelines...")
+        inference.get_sdxl_pipe()
+        inference.get_video_pipe()
+        print("✅ Pipelines loaded")
+
+    resumed = inference.resume_unfinished_jobs()
+    if resumed:
+        print(f"♻️ Resuming {resumed} unfinished render jobs")
+
+    serve(args.socket)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Durable render job storage with per-scene checkpoints.
+Each job is one JSON file under data/jobs holding the render request and the
+state of every scene (pending/rendering/done/failed plus its clip path), so an
+interrupted render can resume from its first incomplete scene.
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+
+JOBS_DIR = os.getenv('JOBS_DIR', 'data/jobs')
+
+# Per-job scratch workspaces for intermediate clips; point at tmpfs
+# (e.g. /dev/shm/movie-scratch) to keep them off the disk
+SCRATCH_DIR = os.getenv('SCRATCH_DIR', 'data/scratch')
+
+# Job states that should be picked up again after a restart
+UNFINISHED_STATUSES = ('pending', 'rendering')
+
+_jobs_lock = threading.RLock()
+
+
+def valid_job_id(job_id):
+    """Whether job_id is a canonical UUID string (job ids become file and directory names)"""
+    try:
+        return isinstance(job_id, str) and str(uuid.UUID(job_id)) == job_id
+    except ValueError:
+        return False
+
+
+def _job_path(job_id):
+    if not valid_job_id(job_id):
+        raise ValueError(f"Invalid job id: {job_id!r}")
+    return os.path.join(JOBS_DIR, f"{job_id}.json")
+
+
+def job_workspace(job_id):
+    """Create (if needed) and return the scratch directory of a job.
+    
+    The directory is removed with everything in it when the job ends, so it
+    must resolve to a directory inside SCRATCH_DIR.
+    """
+    if not valid_job_id(job_id):
+        raise ValueError(f"Invalid job id: {job_id!r}")
+    root = os.path.realpath(SCRATCH_DIR)
+    path = os.path.join(SCRATCH_DIR, job_id)
+    if os.path.dirname(os.path.realpath(path)) != root:
+        raise ValueError(f"Job workspace {path} is outside {SCRATCH_DIR}")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def save_job(job):
+    """Write a job atomically"""
+    with _jobs_lock:
+        os.makedirs(JOBS_DIR, exist_ok=True)
+        job['updated_at'] = time.time()
+        path = _job_path(job['id'])
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(job, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    return job
+
+
+def load_job(job_id):
+    """Load a job, or None if it does not exist"""
+    try:
+        with open(_job_path(job_id), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def create_job(job_id, request, num_scenes):
+    """Persist a new job with every scene pending"""
+    now = time.time()
+    return save_job({
+        'id': job_id,
+        'status': 'pending',
+        'created_at': now,
+        'updated_at': now,
+        'request': request,
+        'scenes': [{'index': i, 'status': 'pending', 'clip_path': None} for i in range(num_scenes)]
+    })
+
+
+def update_job(job_id, **fields):
+    """Update top-level fields of a stored job"""
+    with _jobs_lock:
+        job = load_job(job_id)
+        if job:
+            job.update(fields)
+            save_job(job)
+        return job
+
+
+def update_scene(job_id, index, **fields):
+    """Update the checkpoint of one scene"""
+    with _jobs_lock:
+        job = load_job(job_id)
+        if job and index < len(job['scenes']):
+            job['scenes'][index].update(fields)
+            save_job(job)
+        return job
+
+
+def delete_job(job_id):
+    """Remove a stored job"""
+    try:
+        os.remove(_job_path(job_id))
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def list_jobs():
+    """All stored jobs, oldest first"""
+    if not os.path.isdir(JOBS_DIR):
+        return []
+    jobs = []
+    for name in os.listdir(JOBS_DIR):
+        if name.endswith('.json'):
+            job = load_job(name[:-len('.json')])
+            if job:
+                jobs.append(job)
+    return sorted(jobs, key=lambda job: job.get('created_at', 0))
+
+
+def list_unfinished_jobs():
+    """Jobs that were pending or rendering when the process stopped"""
+    return [job for job in list_jobs() if job.get('status') in UNFINISHED_STATUSES]
@@ -0,0 +1,178 @@
+"""
+Cache of the I2V conditioning work for scene images.
+A Wan image-to-video call loads the scene image, resizes it and VAE-encodes
+it (as the first frame of an otherwise empty video) into the conditioning
+latents. None of that depends on the seed, preset steps or prompt, so it is
+done once per distinct input: prepared images are kept by image content hash
+and target area, and encoder outputs by content hash, size and frame count.
+
+Encoder outputs live on the GPU up to CONDITION_CACHE_GPU_MB; the least
+recently used ones are moved to a CPU tier (CONDITION_CACHE_CPU_MB) and
+dropped from there. The pipeline's vae.encode is wrapped so only calls made
+inside ConditioningCache.use() are served from or stored in the cache.
+"""
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+CONDITION_CACHE_GPU_MB = float(os.getenv('CONDITION_CACHE_GPU_MB', '256'))
+CONDITION_CACHE_CPU_MB = float(os.getenv('CONDITION_CACHE_CPU_MB', '1024'))
+CONDITION_IMAGE_CACHE_SIZE = int(os.getenv('CONDITION_IMAGE_CACHE_SIZE', '32'))
+
+_digests = {}
+_digests_lock = threading.Lock()
+
+
+def image_digest(path):
+    """SHA-256 of an image file's content, remembered per (path, size, mtime)"""
+    stat = os.stat(path)
+    marker = (path, stat.st_size, stat.st_mtime_ns)
+    with _digests_lock:
+        if marker in _digests:
+            return _digests[marker]
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    with _digests_lock:
+        if len(_digests) > 4096:
+            _digests.clear()
+        _digests[marker] = digest.hexdigest()
+        return _digests[marker]
+
+
+class ImageCache:
+    """Small LRU of prepared (loaded and resized) scene images"""
+
+    def __init__(self, size=CONDITION_IMAGE_CACHE_SIZE):
+        self.size = size
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_or_create(self, key, create):
+        with self.lock:
+            if key in self.items:
+                self.items.move_to_end(key)
+                return self.items[key]
+        value = create()
+        with self.lock:
+            self.items[key] = value
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+        return value
+
+
+def _nbytes(tensor):
+    return tensor.nelement() * tensor.element_size()
+
+
+class ConditioningCache:
+    """Two-tier (GPU, then CPU) LRU of VAE encoder outputs, bounded in bytes"""
+
+    def __init__(self, gpu_mb=CONDITION_CACHE_GPU_MB, cpu_mb=CONDITION_CACHE_CPU_MB):
+        self.gpu_limit = int(gpu_mb * 1024 * 1024)
+        self.cpu_limit = int(cpu_mb * 1024 * 1024)
+        self.gpu = OrderedDict()
+        self.cpu = OrderedDict()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _bytes(self, tier):
+        return sum(_nbytes(tensor) for tensor in tier.values())
+
+    def _evict(self):
+        """Demote least recently used GPU entries to CPU, drop CPU entries over the limit"""
+        while self.gpu and self._bytes(self.gpu) > self.gpu_limit:
+            key, tensor = self.gpu.popitem(last=False)
+            self.cpu[key] = tensor.to('cpu')
+        while self.cpu and self._bytes(self.cpu) > self.cpu_limit:
+            self.cpu.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, device):
+        """Cached parameters for key on device (promoted to the GPU tier), or None"""
+        with self.lock:
+            if key in self.gpu:
+                self.gpu.move_to_end(key)
+                tensor = self.gpu[key]
+            elif key in self.cpu:
+                tensor = self.cpu.pop(key).to(device)
+                if str(device) == 'cpu':
+                    self.cpu[key] = tensor
+                else:
+                    self.gpu[key] = tensor
+                    self._evict()
+            else:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return tensor
+
+    def put(self, key, tensor):
+        with self.lock:
+            tier = self.cpu if tensor.device.type == 'cpu' else self.gpu
+            tier[key] = tensor.detach()
+            self._evict()
+
+    def offload(self):
+        """Move every GPU entry to the CPU tier, e.g. to free memory after an OOM"""
+        with self.lock:
+            while self.gpu:
+                key, tensor = self.gpu.popitem(last=False)
+                self.cpu[key] = tensor.to('cpu')
+            self._evict()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'gpu_entries': len(self.gpu),
+                'gpu_mb': round(self._bytes(self.gpu) / 1024 / 1024, 1),
+                'cpu_entries': len(self.cpu),
+                'cpu_mb': round(self._bytes(self.cpu) / 1024 / 1024, 1),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+    @contextmanager
+    def use(self, key):
+        """Serve vae.encode calls of this thread from the cache under key"""
+        self.local.key = key
+        try:
+            yield
+        finally:
+            self.local.key = None
+
+    def install(self, pipe):
+        """Wrap pipe.vae.encode (once) so calls inside use() hit the cache"""
+        vae = getattr(pipe, 'vae', None)
+        if vae is None or getattr(vae, '_conditioning_cache', None) is self:
+            return
+        encode = vae.encode
+
+        def cached_encode(x, *args, **kwargs):
+            key = getattr(self.local, 'key', None)
+            if key is None:
+                return encode(x, *args, **kwargs)
+            from diffusers.models.autoencoders.vae import DiagonalGaussianDistribution
+            from diffusers.models.modeling_outputs import AutoencoderKLOutput
+            parameters = self.get(key, x.device)
+            if parameters is None:
+                output = encode(x, *args, **kwargs)
+                latent_dist = output.latent_dist if hasattr(output, 'latent_dist') else output[0]
+                parameters = latent_dist.parameters
+                self.put(key, parameters)
+                return output
+            latent_dist = DiagonalGaussianDistribution(parameters)
+            if not kwargs.get('return_dict', True):
+                return (latent_dist,)
+            return AutoencoderKLOutput(latent_dist=latent_dist)
+
+        vae.encode = cached_encode
+        vae._conditioning_cache = self
@@ -0,0 +1,344 @@
+"""
+Load generator for the AI Movie Generator.
+Simulates many creators running the create -> script -> images -> video flow
+the way static/js/create-new.js does (one cookie jar per user, sequential
+scene images, progress polling during the render) against a server started
+with the fake model backends, and reports latency percentiles, error rates
+and queue depths per route.
+
+Usage:
+    python loadtest.py --spawn --users 50                  # start a fake-backend server
+    python loadtest.py --url http://localhost:8080 --users 50
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.cookiejar
+import urllib.error
+import urllib.request
+
+from benchmark import summarize, REPO_DIR
+
+GENRES = ['Action', 'Adventure', 'Comedy', 'Drama', 'Horror', 'Romance', 'Sci-Fi', 'Fantasy']
+STYLES = ['Cinematic', 'Realistic', 'Anime', 'Cartoon', 'Fantasy', 'Sci-Fi', 'Horror', 'Comedy']
+
+
+class RouteStats:
+    """Thread-safe latency, status and in-flight tracking per route"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+
+    def _route(self, name):
+        return self.routes.setdefault(name, {
+            'latencies': [], 'errors': 0, 'rejected': 0, 'statuses': {}, 'in_flight': 0, 'max_in_flight': 0
+        })
+
+    def start(self, name):
+        with self.lock:
+            route = self._route(name)
+            route['in_flight'] += 1
+            route['max_in_flight'] = max(route['max_in_flight'], route['in_flight'])
+
+    def finish(self, name, latency, status):
+        with self.lock:
+            route = self._route(name)
+            route['in_flight'] -= 1
+            route['statuses'][str(status)] = route['statuses'].get(str(status), 0) + 1
+            if status == 429:
+                route['rejected'] += 1
+            elif not (200 <= status < 300):
+                route['errors'] += 1
+            else:
+                route['latencies'].append(latency)
+
+    def in_flight(self):
+        with self.lock:
+            return {name: route['in_flight'] for name, route in self.routes.items()}
+
+    def report(self, elapsed):
+        with self.lock:
+            report = {}
+            for name, route in sorted(self.routes.items()):
+                total = sum(route['statuses'].values())
+                summary = summarize(route['latencies'], elapsed=elapsed, errors=route['errors'])
+                summary.update({
+                    'requests': total,
+                    'rejected_429': route['rejected'],
+                    'error_rate': round(route['errors'] / total, 4) if total else 0.0,
+                    'statuses': route['statuses'],
+                    'max_in_flight': route['max_in_flight']
+                })
+                report[name] = summary
+            return report
+
+
+class Creator:
+    """One simulated browser with its own session cookie"""
+
+    def __init__(self, base_url, stats, scenes, preset, poll_interval):
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+        self.scenes = scenes
+        self.preset = preset
+        self.poll_interval = poll_interval
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def request(self, route, path, payload=None, method=None):
+        """Send a request, record it under route, returns (status, parsed JSON or None)"""
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(
+            self.base_url + path, data=data, method=method or ('POST' if data is not None else 'GET'),
+            headers={'Content-Type': 'application/json'} if data is not None else {}
+        )
+        self.stats.start(route)
+        started = time.perf_counter()
+        status, body = 0, None
+        try:
+            with self.opener.open(request, timeout=600) as response:
+                status = response.status
+                body = response.read()
+        except urllib.error.HTTPError as e:
+            status = e.code
+            body = e.read()
+        except Exception:
+            status = 0
+        self.stats.finish(route, time.perf_counter() - started, status)
+        try:
+            return status, json.loads(body) if body else None
+        except ValueError:
+            return status, None
+
+    def poll_job(self, job_id, done):
+        """Poll render progress like pollJobProgress() in create-new.js"""
+        while not done.is_set():
+            self.request('GET /api/jobs/<id>', f"/api/jobs/{job_id}")
+            done.wait(self.poll_interval)
+
+    def run(self):
+        """Replay one creation flow, returns a dict describing the outcome"""
+        title = f"Load Test {uuid.uuid4().hex[:8]}"
+        movie = {
+            'title': title,
+            'genre': random.choice(GENRES),
+            'style': random.choice(STYLES),
+            'description': 'A load test story about many users rendering at once',
+            'numScenes': str(self.scenes)
+        }
+        outcome = {'title': title, 'completed': False, 'session_lost': False}
+
+        self.request('GET /create', '/create')
+        status, data = self.request('POST /generate_script', '/generate_script', movie)
+        if status != 200 or not data or not data.get('success'):
+            outcome['failed_at'] = 'script'
+            return outcome
+
+        images = []
+        for scene in data['scenes']:
+            status, image = self.request('POST /generate_image', '/generate_image', {
+                'scene_id': scene['id'],
+                'scene_content': scene['content'],
+                'genre': movie['genre'],
+                'style': movie['style']
+            })
+            if status == 200 and image and image.get('success'):
+                images.append(image['image_path'])
+        if not images:
+            outcome['failed_at'] = 'images'
+            return outcome
+
+        job_id = str(uuid.uuid4())
+        done = threading.Event()
+        poller = threading.Thread(target=self.poll_job, args=(job_id, done), daemon=True)
+        poller.start()
+        status, video = self.request('POST /generate_video', '/generate_video', {
+            'images': images,
+            'movie_data': movie,
+            'preset': self.preset,
+            'job_id': job_id,
+            'previews': True
+        })
+        done.set()
+        poller.join()
+        if status != 200 or not video or not video.get('success'):
+            outcome['failed_at'] = 'video'
+            return outcome
+
+        # The saved movie takes its title from the session; a different title
+        # means the session (cookie or store) lost this user's data
+        outcome['video_id'] = video['video_id']
+        status, saved = self.request('GET /api/movies/<id>', f"/api/movies/{video['video_id']}")
+        if status != 200 or not saved or saved.get('movie', {}).get('title') != title:
+            outcome['session_lost'] = status == 200
+            outcome['missing_from_history'] = status == 404
+        self.request('GET /api/movies', '/api/movies')
+        outcome['completed'] = True
+        return outcome
+
+
+def monitor(base_url, stats, stop, interval, samples):
+    """Sample the server's GPU queue and client-side in-flight requests"""
+    opener = urllib.request.build_opener()
+    while not stop.wait(interval):
+        sample = {'t': time.time(), 'in_flight': stats.in_flight()}
+        try:
+            with opener.open(base_url.rstrip('/') + '/status', timeout=10) as response:
+                status = json.loads(response.read())
+            sample['gpu_queue'] = ((status.get('system_status') or {}).get('models') or {}).get('gpu_queue')
+        except Exception:
+            sample['gpu_queue'] = None
+        samples.append(sample)
+
+
+def queue_summary(samples):
+    summary = {}
+    for key in ('jobs', 'waiting_units', 'running_units'):
+        values = [s['gpu_queue'][key] for s in samples if s.get('gpu_queue')]
+        if values:
+            summary[key] = {'max': max(values), 'mean': round(sum(values) / len(values), 2)}
+    return summary
+
+
+def serve(port, session_backend):
+    """Run the app with fake backends on a threaded development server"""
+    os.environ.update({
+        'FAKE_BACKENDS': '1',
+        'INFERENCE_MODE': 'local',
+        'VIDEO_STORAGE_TYPE': 'local',
+        'RETENTION_INTERVAL': '0',
+        'IMPORT_TIME_REPORT': '0',
+        'SESSION_BACKEND': session_backend
+    })
+    os.environ.setdefault('SECRET_KEY', 'loadtest')
+    # Every simulated creator renders one movie at a time; let the scheduler queue them all
+    os.environ.setdefault('GPU_MAX_QUEUED_JOBS', '1000')
+    sys.path.insert(0, REPO_DIR)
+    workdir = tempfile.mkdtemp(prefix='movie-loadtest-')
+    os.chdir(workdir)
+    print(f"🧪 Load test server in {workdir} on port {port} (sessions: {session_backend})")
+    import app as web
+    web.app.run(host='127.0.0.1', port=port, threaded=True, debug=False, use_reloader=False)
+
+
+def wait_for_server(base_url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(base_url.rstrip('/') + '/api/model-info', timeout=2):
+                return True
+        except urllib.error.HTTPError:
+            return True
+        except Exception:
+            time.sleep(0.5)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay the creation flow with many concurrent users')
+    parser.add_argument('--url', default='http://127.0.0.1:8090', help='Server to test')
+    parser.add_argument('--spawn', action='store_true', help='Start a fake-backend server for the run')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--session-backend', default='filesystem', help='SESSION_BACKEND of the spawned server')
+    parser.add_argument('--users', type=int, default=50, help='Concurrent creators')
+    parser.add_argument('--ramp', type=float, default=5.0, help='Seconds over which users start')
+    parser.add_argument('--scenes', type=int, default=3, help='Scenes per movie')
+    parser.add_argument('--preset', default='draft', help='Render preset')
+    parser.add_argument('--poll-interval', type=float, default=1.0, help='Job progress poll interval (s)')
+    parser.add_argument('--output', default='loadtest_report.json', help='JSON report path')
+    args = parser.parse_args()
+
+    port = int(args.url.rsplit(':', 1)[-1].split('/')[0])
+    if args.serve:
+        serve(port, args.session_backend)
+        return 0
+
+    server = None
+    if args.spawn:
+        server = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--serve', '--url', args.url,
+             '--session-backend', args.session_backend],
+            stdout=subprocess.DEVNULL
+        )
+        if not wait_for_server(args.url):
+            server.terminate()
+            print("❌ Load test server did not start")
+            return 1
+
+    stats = RouteStats()
+    samples = []
+    outcomes = []
+    outcomes_lock = threading.Lock()
+    stop = threading.Event()
+    threading.Thread(target=monitor, args=(args.url, stats, stop, 1.0, samples), daemon=True).start()
+
+    def user(delay):
+        time.sleep(delay)
+        outcome = Creator(args.url, stats, args.scenes, args.preset, args.poll_interval).run()
+        with outcomes_lock:
+            outcomes.append(outcome)
+
+    print(f"🚀 {args.users} creators against {args.url} ({args.scenes} scenes, preset {args.preset})")
+    started = time.time()
+    threads = [
+        threading.Thread(target=user, args=(args.ramp * i / max(1, args.users),))
+        for i in range(args.users)
+    ]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        stop.set()
+        elapsed = time.time() - started
+        if server:
+            server.terminate()
+            server.wait()
+
+    completed = [o for o in outcomes if o['completed']]
+    report = {
+        'config': {
+            'url': args.url,
+            'users': args.users,
+            'ramp': args.ramp,
+            'scenes': args.scenes,
+            'preset': args.preset,
+            'session_backend': args.session_backend if args.spawn else None
+        },
+        'duration_seconds': round(elapsed, 1),
+        'flows': {
+            'completed': len(completed),
+            'failed': len(outcomes) - len(completed),
+            'failed_at': {stage: sum(1 for o in outcomes if o.get('failed_at') == stage)
+                          for stage in ('script', 'images', 'video')},
+            'session_lost': sum(1 for o in outcomes if o.get('session_lost')),
+            'missing_from_history': sum(1 for o in outcomes if o.get('missing_from_history'))
+        },
+        'routes': stats.report(elapsed),
+        'gpu_queue': queue_summary(samples)
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    print(f"\n📊 {len(completed)}/{len(outcomes)} flows completed in {elapsed:.1f}s")
+    for name, route in report['routes'].items():
+        print(f"   {name:<24} n={route['requests']:<5} p50={route['p50_ms']} ms p95={route['p95_ms']} ms "
+              f"err={route['error_rate']:.1%} 429={route['rejected_429']} max_in_flight={route['max_in_flight']}")
+    flows = report['flows']
+    if flows['session_lost'] or flows['missing_from_history']:
+        print(f"   ⚠️ Session data lost: {flows['session_lost']}, movies missing from history: {flows['missing_from_history']}")
+    print(f"✅ Load test report written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+History page artifacts of a finished movie: a poster frame, a few-second
+low-bitrate hover preview and a seek thumbnail sprite sheet with a WebVTT
+index, so browsing the history never loads the full video.
+Scenes are sampled while their frames are still in memory
+(sample_scene_frames runs on the post-processing pool next to the clip
+encode); scenes without samples (resumed from a checkpoint, or reused by a
+single-scene re-render) are sampled from their clip files instead. Files are
+named after the video: <video>_poster.jpg, <video>_preview.mp4,
+<video>_sprites.jpg and <video>_sprites.vtt.
+"""
+
+import os
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from postprocess import to_uint8_frames
+
+ARTIFACT_DIR = os.getenv('ARTIFACT_DIR', 'static/output')
+SPRITE_INTERVAL = float(os.getenv('SPRITE_INTERVAL', '1.0'))  # seconds between seek thumbnails
+SPRITE_WIDTH = int(os.getenv('SPRITE_WIDTH', '160'))
+SPRITE_COLUMNS = int(os.getenv('SPRITE_COLUMNS', '10'))
+PREVIEW_SECONDS = float(os.getenv('PREVIEW_SECONDS', '4'))
+PREVIEW_WIDTH = int(os.getenv('PREVIEW_WIDTH', '320'))
+PREVIEW_FPS = int(os.getenv('PREVIEW_FPS', '8'))
+PREVIEW_BITRATE = os.getenv('PREVIEW_BITRATE', '150k')
+
+
+def _resize_width(frame, width):
+    """Downscale a uint8 frame to width (even height, as H.264 needs)"""
+    height, current = frame.shape[:2]
+    if current <= width:
+        return frame
+    new_height = max(2, round(height * width / current / 2) * 2)
+    return cv2.resize(frame, (width, new_height), interpolation=cv2.INTER_AREA)
+
+
+def _frame(frames, index):
+    return to_uint8_frames([frames[min(index, len(frames) - 1)]])[0]
+
+
+def sample_scene_frames(frames, fps):
+    """Poster frame, seek thumbnails and preview frames of one scene.
+
+    Only the sampled frames are converted (when not already uint8) and
+    resized, so this is cheap to run on the full-resolution frame buffer.
+    """
+    duration = len(frames) / fps
+    thumbs = [
+        _resize_width(_frame(frames, int(t * fps)), SPRITE_WIDTH)
+        for t in np.arange(0, duration, SPRITE_INTERVAL)
+    ]
+    # Keep at most PREVIEW_SECONDS of preview frames around the middle of the scene
+    step = max(1, round(fps / PREVIEW_FPS))
+    indices = list(range(0, len(frames), step))
+    keep = max(1, int(PREVIEW_SECONDS * PREVIEW_FPS))
+    start = max(0, (len(indices) - keep) // 2)
+    preview = [_resize_width(_frame(frames, i), PREVIEW_WIDTH) for i in indices[start:start + keep]]
+    return {
+        'duration': duration,
+        'poster': _frame(frames, len(frames) // 2),
+        'thumbs': thumbs,
+        'preview': preview
+    }
+
+
+def sample_clip_frames(clip_path):
+    """sample_scene_frames of an encoded clip file"""
+    from moviepy.editor import VideoFileClip
+    clip = VideoFileClip(clip_path)
+    try:
+        return sample_scene_frames(list(clip.iter_frames()), clip.fps)
+    finally:
+        clip.close()
+
+
+def _fit(frame, size):
+    return frame if frame.shape[1::-1] == size else cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+
+def _timestamp(seconds):
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{seconds:06.3f}"
+
+
+def _url(path):
+    return path if path.startswith('/') else f"/{path}"
+
+
+def write_preview(samples, path):
+    """Encode a PREVIEW_SECONDS clip with an equal slice of every scene"""
+    from moviepy.editor import ImageSequenceClip
+    per_scene = max(1, int(PREVIEW_SECONDS * PREVIEW_FPS) // len(samples))
+    frames = []
+    for sample in samples:
+        start = max(0, (len(sample['preview']) - per_scene) // 2)
+        frames.extend(sample['preview'][start:start + per_scene])
+    size = frames[0].shape[1::-1]
+    clip = ImageSequenceClip([_fit(frame, size) for frame in frames], fps=PREVIEW_FPS)
+    temp_path = f"{path[:-4]}.tmp.mp4"
+    clip.write_videofile(
+        temp_path, codec='libx264', bitrate=PREVIEW_BITRATE, audio=False, logger=None,
+        ffmpeg_params=['-pix_fmt', 'yuv420p', '-movflags', '+faststart']
+    )
+    os.replace(temp_path, path)
+
+
+def write_sprites(samples, sheet_path, vtt_path):
+    """Tile every seek thumbnail into one JPEG and index it with WebVTT cues"""
+    thumbs, starts = [], []
+    offset = 0.0
+    for sample in samples:
+        for i, thumb in enumerate(sample['thumbs']):
+            thumbs.append(thumb)
+            starts.append(offset + i * SPRITE_INTERVAL)
+        offset += sample['duration']
+
+    tile_w, tile_h = thumbs[0].shape[1::-1]
+    columns = min(SPRITE_COLUMNS, len(thumbs))
+    rows = (len(thumbs) + columns - 1) // columns
+    sheet = np.zeros((rows * tile_h, columns * tile_w, 3), dtype=np.uint8)
+    cues = ["WEBVTT", ""]
+    sheet_name = os.path.basename(sheet_path)
+    for i, thumb in enumerate(thumbs):
+        x, y = (i % columns) * tile_w, (i // columns) * tile_h
+        sheet[y:y + tile_h, x:x + tile_w] = _fit(thumb, (tile_w, tile_h))
+        end = starts[i + 1] if i + 1 < len(starts) else offset
+        cues += [f"{_timestamp(starts[i])} --> {_timestamp(end)}", f"{sheet_name}#xywh={x},{y},{tile_w},{tile_h}", ""]
+
+    Image.fromarray(sheet).save(sheet_path, format='JPEG', quality=70)
+    with open(vtt_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(cues))
+
+
+def build_movie_artifacts(samples, video_name):
+    """Write the poster, hover preview and seek sprites of a movie from its scene
+    samples (in playback order), returns their URLs for the movie record"""
+    if not samples:
+        return None
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(video_name))[0]
+    paths = {
+        'poster': os.path.join(ARTIFACT_DIR, f"{stem}_poster.jpg"),
+        'preview': os.path.join(ARTIFACT_DIR, f"{stem}_preview.mp4"),
+        'sprites': os.path.join(ARTIFACT_DIR, f"{stem}_sprites.jpg"),
+        'sprites_vtt': os.path.join(ARTIFACT_DIR, f"{stem}_sprites.vtt")
+    }
+    Image.fromarray(samples[0]['poster']).save(paths['poster'], format='JPEG', quality=85)
+    write_preview(samples, paths['preview'])
+    write_sprites(samples, paths['sprites'], paths['sprites_vtt'])
+    print(f"🖼️ History artifacts written for {stem} ({len(samples)} scenes)")
+    return {name: _url(path) for name, path in paths.items()}
@@ -0,0 +1,134 @@
+"""
+Movie history storage (data/movies.json).
+Kept free of heavy imports so both the web tier and the inference side can
+record movies.
+The history is written by every web worker and by the inference daemon, so
+writes go to a temporary file that replaces the history atomically, and
+read-modify-write cycles hold an flock on data/movies.json.lock as well as
+the in-process lock.
+"""
+
+import os
+import json
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # No flock (Windows): only threads of one process are serialized
+    fcntl = None
+
+# Movies storage file
+MOVIES_FILE = 'data/movies.json'
+
+
+class HistoryLock:
+    """Re-entrant lock over the history, shared by threads and processes.
+
+    The outermost holder in a process also takes an exclusive flock on
+    MOVIES_FILE.lock, which the other processes wait on.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def __enter__(self):
+        self._lock.acquire()
+        if self._depth == 0 and fcntl is not None:
+            try:
+                os.makedirs(os.path.dirname(MOVIES_FILE) or '.', exist_ok=True)
+                self._fd = os.open(f"{MOVIES_FILE}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            except OSError:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+                self._lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._lock.release()
+
+
+# Serializes read-modify-write cycles between request threads, render workers and processes
+movies_lock = HistoryLock()
+
+def load_movies():
+    """Load movies from storage.
+    
+    A missing file is an empty history. A file that cannot be read or parsed
+    raises instead, so no caller ever saves an empty history over it.
+    """
+    if not os.path.exists(MOVIES_FILE):
+        return []
+    try:
+        with open(MOVIES_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error loading movies from {MOVIES_FILE}: {e}")
+        raise
+
+def save_movies(movies):
+    """Save movies to storage (atomically)"""
+    try:
+        with movies_lock:
+            os.makedirs(os.path.dirname(MOVIES_FILE) or '.', exist_ok=True)
+            tmp_path = f"{MOVIES_FILE}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(movies, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, MOVIES_FILE)
+        return True
+    except Exception as e:
+        print(f"Error saving movies: {e}")
+        return False
+
+def save_movie(movie_data):
+    """Save a single movie to storage"""
+    with movies_lock:
+        movies = load_movies()
+        movies.append(movie_data)
+        return save_movies(movies)
+
+def update_movie(movie_id, updates):
+    """Update fields of a stored movie, returns the updated movie or None"""
+    with movies_lock:
+        movies = load_movies()
+        for movie in movies:
+            if movie.get('id') == movie_id:
+                movie.update(updates)
+                return movie if save_movies(movies) else None
+    return None
+
+def modify_movie(movie_id, modify):
+    """Call modify(movie) on a stored movie under the lock, returns the updated movie or None.
+    
+    Use this instead of update_movie when the new values depend on the
+    current ones (e.g. replacing one entry of a list), so concurrent edits
+    are not lost.
+    """
+    with movies_lock:
+        movies = load_movies()
+        for movie in movies:
+            if movie.get('id') == movie_id:
+                modify(movie)
+                return movie if save_movies(movies) else None
+    return None
+
+def delete_movies(movie_ids):
+    """Remove movies by ID, returns the removed movie records"""
+    movie_ids = set(movie_ids)
+    with movies_lock:
+        movies = load_movies()
+        removed = [m for m in movies if m.get('id') in movie_ids]
+        if removed and not save_movies([m for m in movies if m.get('id') not in movie_ids]):
+            return []
+        return removed
@@ -0,0 +1,203 @@
+"""
+Per-scene narration for rendered movies.
+Scene text is sent to the ElevenLabs text-to-speech API on a small thread
+pool as soon as a render starts, so synthesis overlaps the GPU video work.
+Results are cached on disk by a hash of the voice, model and text, so
+re-rendering a scene or a whole movie does not pay for the same speech again.
+Once the video is concatenated, each scene's narration is sped up (up to
+NARRATION_MAX_TEMPO), padded or trimmed to its clip's duration and muxed into
+the MP4 with ffmpeg; the video stream is copied, not re-encoded.
+
+Set ELEVENLABS_BASE_URL to a local stand-in (python fake_backends.py
+--tts-port 8766) to exercise the stage without an account.
+"""
+
+import os
+import re
+import glob
+import json
+import time
+import random
+import hashlib
+import subprocess
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ELEVENLABS_API_KEY = os.getenv('ELEVENLABS_API_KEY', '')
+ELEVENLABS_BASE_URL = os.getenv('ELEVENLABS_BASE_URL', 'https://api.elevenlabs.io').rstrip('/')
+ELEVENLABS_MODEL = os.getenv('ELEVENLABS_MODEL', 'eleven_multilingual_v2')
+NARRATION_VOICE = os.getenv('NARRATION_VOICE', '21m00Tcm4TlvDq8ikWAM')
+NARRATION_ENABLED = os.getenv('NARRATION', '1') == '1' and bool(ELEVENLABS_API_KEY)
+NARRATION_CACHE_DIR = os.getenv('NARRATION_CACHE_DIR', 'data/tts_cache')
+NARRATION_TIMEOUT = float(os.getenv('NARRATION_TIMEOUT', '60'))
+NARRATION_RETRIES = int(os.getenv('NARRATION_RETRIES', '3'))
+# Speech is sped up by at most this factor to fit its clip, then trimmed
+NARRATION_MAX_TEMPO = float(os.getenv('NARRATION_MAX_TEMPO', '1.3'))
+NARRATION_WORDS_PER_SECOND = float(os.getenv('NARRATION_WORDS_PER_SECOND', '2.5'))
+
+AUDIO_EXTENSIONS = {'audio/mpeg': '.mp3', 'audio/wav': '.wav', 'audio/x-wav': '.wav'}
+
+narration_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv('NARRATION_WORKERS', '4')), thread_name_prefix='narration'
+)
+
+
+def ffmpeg_binary():
+    """ffmpeg shipped with imageio-ffmpeg (installed with moviepy), else the one on PATH"""
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except (ImportError, RuntimeError):
+        return 'ffmpeg'
+
+
+def narration_text(scene, max_seconds=None):
+    """Text to narrate for a scene: its content without the heading, cut at a
+    sentence boundary to what can be spoken in max_seconds"""
+    text = (scene or {}).get('content', '') if isinstance(scene, dict) else str(scene or '')
+    text = re.sub(r'^\s*Scene\s+\d+\s*:[^\n]*\n', '', text).strip()
+    text = ' '.join(text.split())
+    if not text or not max_seconds:
+        return text
+    budget = max(1, int(max_seconds * NARRATION_WORDS_PER_SECOND * NARRATION_MAX_TEMPO))
+    kept = []
+    for sentence in re.split(r'(?<=[.!?])\s+', text):
+        if kept and len(' '.join(kept + [sentence]).split()) > budget:
+            break
+        kept.append(sentence)
+    words = ' '.join(kept).split()
+    return ' '.join(words[:budget])
+
+
+def cache_key(text, voice):
+    return hashlib.sha256(f"{voice}|{ELEVENLABS_MODEL}|{text}".encode('utf-8')).hexdigest()
+
+
+def cached_audio(text, voice):
+    """Path of the cached narration of text in voice, or None"""
+    matches = glob.glob(os.path.join(NARRATION_CACHE_DIR, f"{cache_key(text, voice)}.*"))
+    return next((path for path in matches if not path.endswith('.tmp')), None)
+
+
+def _request(text, voice):
+    url = f"{ELEVENLABS_BASE_URL}/v1/text-to-speech/{voice}?output_format=mp3_44100_128"
+    body = json.dumps({'text': text, 'model_id': ELEVENLABS_MODEL}).encode('utf-8')
+    request = urllib.request.Request(url, data=body, method='POST', headers={
+        'xi-api-key': ELEVENLABS_API_KEY,
+        'Content-Type': 'application/json',
+        'Accept': 'audio/mpeg'
+    })
+    with urllib.request.urlopen(request, timeout=NARRATION_TIMEOUT) as response:
+        content_type = response.headers.get('Content-Type', 'audio/mpeg').split(';')[0].strip()
+        return response.read(), AUDIO_EXTENSIONS.get(content_type, '.mp3')
+
+
+def synthesize(text, voice=None):
+    """Narration of text as an audio file path, from the cache or the TTS API.
+
+    Rate limits and server errors are retried with jittered backoff; other
+    errors raise.
+    """
+    voice = voice or NARRATION_VOICE
+    path = cached_audio(text, voice)
+    if path:
+        return path
+
+    for attempt in range(NARRATION_RETRIES):
+        try:
+            started = time.perf_counter()
+            audio, extension = _request(text, voice)
+            break
+        except urllib.error.HTTPError as e:
+            if e.code not in (429, 500, 502, 503) or attempt == NARRATION_RETRIES - 1:
+                raise
+            delay = (2 ** attempt) * (0.5 + random.random())
+            print(f"⚠️ TTS returned {e.code}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+    os.makedirs(NARRATION_CACHE_DIR, exist_ok=True)
+    path = os.path.join(NARRATION_CACHE_DIR, f"{cache_key(text, voice)}{extension}")
+    with open(f"{path}.tmp", 'wb') as f:
+        f.write(audio)
+    os.replace(f"{path}.tmp", path)
+    print(f"🔊 Narration synthesized ({len(text.split())} words, {time.perf_counter() - started:.2f}s)")
+    return path
+
+
+def submit_narration(scenes, voice=None, max_seconds=None):
+    """Start synthesizing every scene's narration, returns one future (or None
+    for scenes without text) per scene"""
+    futures = []
+    for scene in scenes or []:
+        text = narration_text(scene, max_seconds)
+        futures.append(narration_pool.submit(synthesize, text, voice) if text else None)
+    return futures
+
+
+def audio_duration(path):
+    from moviepy.editor import AudioFileClip
+    clip = AudioFileClip(path)
+    try:
+        return clip.duration
+    finally:
+        clip.close()
+
+
+def narration_filter(tracks, durations):
+    """ffmpeg filter graph that fits each scene's track (input index and audio
+    duration, or None) to its clip duration and concatenates them as [narration]"""
+    chains = []
+    for i, (track, duration) in enumerate(zip(tracks, durations)):
+        if track is None:
+            chains.append(f"anullsrc=r=44100:cl=stereo,atrim=0:{duration:.3f},asetpts=N/SR/TB[s{i}]")
+            continue
+        index, length = track
+        tempo = min(NARRATION_MAX_TEMPO, length / duration) if duration else 1.0
+        fade = min(0.25, duration / 4)
+        chains.append(
+            f"[{index}:a]aformat=sample_rates=44100:channel_layouts=stereo,"
+            + (f"atempo={tempo:.4f}," if tempo > 1.001 else '')
+            + f"apad,atrim=0:{duration:.3f},asetpts=N/SR/TB,"
+            f"afade=t=out:st={duration - fade:.3f}:d={fade:.3f}[s{i}]"
+        )
+    inputs = ''.join(f"[s{i}]" for i in range(len(durations)))
+    chains.append(f"{inputs}concat=n={len(durations)}:v=0:a=1[narration]")
+    return ';'.join(chains)
+
+
+def attach_narration(video_path, clip_durations, audio_paths):
+    """Mux narration into video_path in place, one track (or None) per clip.
+
+    The video stream is copied; only the narration is encoded (AAC). Returns
+    the number of narrated scenes; the video is left untouched on failure.
+    """
+    if not any(audio_paths):
+        return 0
+    inputs, tracks = [], []
+    for path in audio_paths:
+        if path:
+            inputs.append(path)
+            tracks.append((len(inputs), audio_duration(path)))
+        else:
+            tracks.append(None)
+
+    temp_path = f"{video_path[:-4]}.narrated.mp4"
+    command = [ffmpeg_binary(), '-y', '-v', 'error', '-i', video_path]
+    for path in inputs:
+        command += ['-i', path]
+    command += [
+        '-filter_complex', narration_filter(tracks, clip_durations),
+        '-map', '0:v:0', '-map', '[narration]',
+        '-c:v', 'copy', '-c:a', 'aac', '-b:a', '128k',
+        '-shortest', '-movflags', '+faststart', temp_path
+    ]
+    started = time.perf_counter()
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.strip()[-500:]}")
+    os.replace(temp_path, video_path)
+    print(f"🔊 Narration muxed into {video_path} ({len(inputs)} scenes, {time.perf_counter() - started:.2f}s)")
+    return len(inputs)
@@ -0,0 +1,198 @@
+"""
+Movie poster compositor.
+Builds a 9:16 poster from the movie's existing scene images on the CPU: the
+images are ranked by sharpness, colourfulness and exposure, the best one is
+cropped (when little would be lost) or outpainted with a blurred extension of
+itself to the poster shape, and the title is typeset over a bottom gradient.
+Diffusion is only needed when a movie has no usable scene image; see
+generate_poster_art in inference.py.
+"""
+
+import os
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+POSTER_SIZE = (int(os.getenv('POSTER_WIDTH', '1080')), int(os.getenv('POSTER_HEIGHT', '1920')))
+POSTER_FONT = os.getenv('POSTER_FONT', '')
+# Crop instead of outpainting when the crop keeps at least this share of the image width
+POSTER_MIN_CROP = float(os.getenv('POSTER_MIN_CROP', '0.75'))
+# Images whose score is below this (flat placeholders) are never used
+POSTER_MIN_SCORE = float(os.getenv('POSTER_MIN_SCORE', '0.05'))
+# Candidates rendered in the single diffusion call when there is no scene image
+POSTER_CANDIDATES = int(os.getenv('POSTER_CANDIDATES', '2'))
+
+FONT_CANDIDATES = (
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
+    '/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf',
+    '/Library/Fonts/Arial Bold.ttf',
+    'C:/Windows/Fonts/arialbd.ttf'
+)
+
+
+def score_image(image):
+    """Ranking score of a scene image, 0 for a flat placeholder.
+
+    Combines sharpness (variance of the Laplacian), colourfulness
+    (Hasler-Suesstrunk) and how well exposed the image is, on a 256px copy.
+    """
+    small = image.convert('RGB')
+    small.thumbnail((256, 256))
+    rgb = np.asarray(small, dtype=np.float32) / 255.0
+    gray = rgb.mean(axis=2)
+    if gray.std() < 0.01:
+        return 0.0
+    laplacian = (gray[1:-1, :-2] + gray[1:-1, 2:] + gray[:-2, 1:-1] + gray[2:, 1:-1] - 4 * gray[1:-1, 1:-1])
+    sharpness = min(1.0, laplacian.var() * 100)
+    rg = rgb[..., 0] - rgb[..., 1]
+    yb = 0.5 * (rgb[..., 0] + rgb[..., 1]) - rgb[..., 2]
+    colourfulness = min(1.0, (np.hypot(rg.std(), yb.std()) + 0.3 * np.hypot(rg.mean(), yb.mean())) * 3)
+    exposure = 1.0 - min(1.0, abs(gray.mean() - 0.45) * 2)
+    return float(0.5 * sharpness + 0.3 * colourfulness + 0.2 * exposure)
+
+
+def rank_images(image_paths):
+    """Usable images of image_paths as [(score, path)], best first (ties keep scene order)"""
+    ranked = []
+    for order, path in enumerate(image_paths):
+        try:
+            with Image.open(path) as image:
+                # JPEG draft mode decodes at a fraction of the size, enough to score
+                image.draft('RGB', (256, 256))
+                score = score_image(image)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Skipping poster candidate {path}: {e}")
+            continue
+        if score >= POSTER_MIN_SCORE:
+            ranked.append((score, -order, path))
+    ranked.sort(reverse=True)
+    return [(score, path) for score, _, path in ranked]
+
+
+def _focus_x(image):
+    """Horizontal centre of detail (edge energy) as a fraction of the width"""
+    gray = np.asarray(image.convert('L').resize((128, 128)), dtype=np.float32)
+    energy = np.abs(np.diff(gray, axis=1)).sum(axis=0) + 1e-6
+    return float((energy * np.arange(energy.size)).sum() / energy.sum() / energy.size)
+
+
+def fit_portrait(image, size=POSTER_SIZE):
+    """Crop or outpaint image to size.
+
+    Wide images that would lose more than POSTER_MIN_CROP of their width are
+    outpainted: the image is fitted to the width over a blurred, darkened
+    cover-scaled copy of itself, blended with feathered edges.
+    """
+    image = image.convert('RGB')
+    width, height = size
+    target_ratio = width / height
+    crop_share = target_ratio * image.height / image.width
+
+    if crop_share >= POSTER_MIN_CROP:
+        if crop_share >= 1:
+            crop_h = round(image.width / target_ratio)
+            top = max(0, (image.height - crop_h) // 3)
+            box = (0, top, image.width, top + crop_h)
+        else:
+            crop_w = round(image.height * target_ratio)
+            left = int(np.clip(_focus_x(image) * image.width - crop_w / 2, 0, image.width - crop_w))
+            box = (left, 0, left + crop_w, image.height)
+        return image.crop(box).resize(size, Image.LANCZOS)
+
+    scale = max(width / image.width, height / image.height)
+    cover = image.resize((round(image.width * scale), round(image.height * scale)), Image.BILINEAR)
+    left, top = (cover.width - width) // 2, (cover.height - height) // 2
+    background = cover.crop((left, top, left + width, top + height))
+    background = background.filter(ImageFilter.GaussianBlur(radius=width // 25))
+    background = Image.eval(background, lambda v: int(v * 0.55))
+
+    fitted_h = round(image.height * width / image.width)
+    fitted = image.resize((width, fitted_h), Image.LANCZOS)
+    feather = max(1, fitted_h // 8)
+    ramp = np.minimum(np.arange(fitted_h), np.arange(fitted_h)[::-1]) / feather
+    mask = Image.fromarray((np.clip(ramp, 0, 1) * 255).astype(np.uint8)[:, None].repeat(width, axis=1))
+    background.paste(fitted, (0, int((height - fitted_h) * 0.35)), mask)
+    return background
+
+
+def _font(size):
+    for path in ((POSTER_FONT,) if POSTER_FONT else ()) + FONT_CANDIDATES:
+        if path and os.path.exists(path):
+            return ImageFont.truetype(path, size)
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow < 10.1 has a single fixed-size bitmap font
+        return ImageFont.load_default()
+
+
+def _wrap(draw, text, font, max_width):
+    lines, line = [], ''
+    for word in text.split():
+        candidate = f"{line} {word}".strip()
+        if line and draw.textlength(candidate, font=font) > max_width:
+            lines.append(line)
+            line = word
+        else:
+            line = candidate
+    return lines + [line] if line else lines
+
+
+def typeset_title(poster, title, subtitle=''):
+    """Draw title (and a small subtitle line) over a dark gradient at the bottom of poster"""
+    width, height = poster.size
+    gradient_h = height * 2 // 5
+    alpha = (np.linspace(0, 1, gradient_h) ** 1.5 * 220).astype(np.uint8)
+    shade = Image.new('RGB', (width, gradient_h), (0, 0, 0))
+    poster.paste(shade, (0, height - gradient_h), Image.fromarray(alpha[:, None].repeat(width, axis=1)))
+
+    draw = ImageDraw.Draw(poster)
+    margin = width // 12
+    max_width = width - 2 * margin
+    text = (title or 'Untitled').upper()
+    # Largest size at which the title fits in three lines
+    for size in range(width // 7, width // 28, -max(1, width // 200)):
+        font = _font(size)
+        lines = _wrap(draw, text, font, max_width)
+        if len(lines) <= 3 and all(draw.textlength(line, font=font) <= max_width for line in lines):
+            break
+    line_h = round(size * 1.1)
+
+    sub_font = _font(max(12, size // 3))
+    y = height - margin - (line_h // 2 if subtitle else 0) - line_h * len(lines)
+    for line in lines:
+        x = (width - draw.textlength(line, font=font)) / 2
+        draw.text((x, y), line, font=font, fill=(255, 255, 255),
+                  stroke_width=max(1, size // 30), stroke_fill=(0, 0, 0))
+        y += line_h
+    if subtitle:
+        x = (width - draw.textlength(subtitle.upper(), font=sub_font)) / 2
+        draw.text((x, y + line_h // 8), subtitle.upper(), font=sub_font, fill=(220, 220, 220))
+    return poster
+
+
+def compose_poster(image_paths, title, subtitle, poster_path, size=POSTER_SIZE):
+    """Compose a poster from the best of image_paths into poster_path.
+
+    Returns (poster image, source path), or (None, None) when none of the
+    images is usable, in which case nothing is written.
+    """
+    ranked = rank_images(image_paths)
+    if not ranked:
+        return None, None
+    score, source = ranked[0]
+    print(f"🖼️ Poster from {os.path.basename(source)} (score {score:.2f} of {len(ranked)} candidates)")
+    with Image.open(source) as image:
+        poster = typeset_title(fit_portrait(image, size), title, subtitle)
+    poster.save(poster_path, format='JPEG', quality=90)
+    return poster, source
+
+
+def plain_poster(title, subtitle, poster_path, size=POSTER_SIZE):
+    """Title on a dark vertical gradient, for when no art could be rendered either"""
+    ramp = np.linspace(0, 1, size[1], dtype=np.float32)[:, None, None]
+    colours = (1 - ramp) * np.array([20, 20, 40]) + ramp * np.array([60, 20, 50])
+    poster = Image.fromarray(np.broadcast_to(colours, (size[1], size[0], 3)).astype(np.uint8))
+    poster = typeset_title(poster, title, subtitle)
+    poster.save(poster_path, format='JPEG', quality=90)
+    return poster
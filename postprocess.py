@@ -0,0 +1,248 @@
+"""
+CPU post-processing stages for rendered clips.
+These run on worker threads next to the GPU diffusion work, so they only use
+numpy, OpenCV and PIL.
+"""
+
+import os
+import threading
+
+import cv2
+import numpy as np
+
+
+def to_uint8_frames(frames):
+    """Convert PIL images or float [0, 1] arrays into a list of uint8 RGB arrays"""
+    converted = []
+    for frame in frames:
+        frame = np.asarray(frame)
+        if frame.dtype != np.uint8:
+            frame = (np.clip(frame, 0, 1) * 255).round().astype(np.uint8)
+        converted.append(frame)
+    return converted
+
+
+def to_uint8_array(frames, chunk=8):
+    """Convert frames into one contiguous (T, H, W, 3) uint8 array.
+
+    Float input is converted chunk frames at a time into a preallocated
+    buffer, so the conversion never holds a second full-size float copy.
+    A contiguous uint8 array is returned as is.
+    """
+    if isinstance(frames, np.ndarray) and frames.dtype == np.uint8 and frames.flags['C_CONTIGUOUS']:
+        return frames
+    if len(frames) == 0:
+        return np.empty((0, 0, 0, 3), dtype=np.uint8)
+    first = np.asarray(frames[0])
+    buffer = np.empty((len(frames),) + first.shape, dtype=np.uint8)
+    for start in range(0, len(frames), chunk):
+        block = np.asarray(frames[start:start + chunk]) if isinstance(frames, np.ndarray) \
+            else np.stack([np.asarray(frame) for frame in frames[start:start + chunk]])
+        if block.dtype != np.uint8:
+            block = (np.clip(block, 0, 1) * 255).round()
+        buffer[start:start + len(block)] = block
+    return buffer
+
+
+def export_frames(frames, path, fps, quality=5.0):
+    """Encode a (T, H, W, 3) uint8 frame buffer to an MP4, one frame at a time.
+
+    Same imageio/ffmpeg settings as diffusers' export_to_video, without its
+    per-frame float -> uint8 copies.
+    """
+    import imageio
+    with imageio.get_writer(path, fps=fps, quality=quality) as writer:
+        for frame in frames:
+            writer.append_data(frame)
+    return path
+
+
+def _optical_flow(src, dst):
+    """Dense Farneback flow from src to dst (both uint8 RGB)"""
+    src_gray = cv2.cvtColor(src, cv2.COLOR_RGB2GRAY)
+    dst_gray = cv2.cvtColor(dst, cv2.COLOR_RGB2GRAY)
+    return cv2.calcOpticalFlowFarneback(
+        src_gray, dst_gray, None,
+        pyr_scale=0.5, levels=3, winsize=15,
+        iterations=3, poly_n=5, poly_sigma=1.2, flags=0
+    )
+
+
+def _warp(frame, flow, scale, grid_x, grid_y):
+    """Backward-warp a frame by a scaled flow field"""
+    map_x = grid_x - scale * flow[..., 0]
+    map_y = grid_y - scale * flow[..., 1]
+    return cv2.remap(frame, map_x, map_y, interpolation=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+
+def interpolate_frames(frames, src_fps, target_fps):
+    """Resample a clip to target_fps using optical-flow frame interpolation.
+
+    Works for any ratio (16 -> 24 as well as 16 -> 32) by placing every output
+    frame on the source timeline and blending the two neighbouring source
+    frames, each warped toward that instant. Returns a (T, H, W, 3) uint8 array.
+    """
+    frames = to_uint8_array(frames)
+    if not target_fps or target_fps <= src_fps or len(frames) < 2:
+        return frames
+
+    height, width = frames[0].shape[:2]
+    grid_x, grid_y = np.meshgrid(np.arange(width, dtype=np.float32), np.arange(height, dtype=np.float32))
+
+    duration = (len(frames) - 1) / src_fps
+    num_output = int(round(duration * target_fps)) + 1
+    flows = {}
+    output = np.empty((num_output,) + frames.shape[1:], dtype=np.uint8)
+
+    for i in range(num_output):
+        position = min(i * src_fps / target_fps, len(frames) - 1)
+        index = int(position)
+        t = position - index
+
+        if t < 1e-3 or index >= len(frames) - 1:
+            output[i] = frames[index]
+            continue
+
+        if index not in flows:
+            flows[index] = (
+                _optical_flow(frames[index], frames[index + 1]),
+                _optical_flow(frames[index + 1], frames[index])
+            )
+        forward, backward = flows[index]
+
+        from_prev = _warp(frames[index], forward, t, grid_x, grid_y)
+        from_next = _warp(frames[index + 1], backward, 1 - t, grid_x, grid_y)
+        cv2.addWeighted(from_prev, 1 - t, from_next, t, 0, dst=output[i])
+
+        # Flows of pairs we have moved past are no longer needed
+        for stale in [k for k in flows if k < index]:
+            del flows[stale]
+
+    return output
+
+
+# Upscaler registry: name -> callable(frame uint8 RGB, (width, height)) -> frame
+UPSCALERS = {}
+
+
+def register_upscaler(name):
+    """Decorator that registers an upscaler under the given name"""
+    def decorator(func):
+        UPSCALERS[name] = func
+        return func
+    return decorator
+
+
+@register_upscaler('lanczos')
+def lanczos_upscale(frame, size):
+    """Classical baseline: Lanczos resampling followed by a light unsharp mask"""
+    upscaled = cv2.resize(frame, size, interpolation=cv2.INTER_LANCZOS4)
+    blurred = cv2.GaussianBlur(upscaled, (0, 0), sigmaX=1.0)
+    return cv2.addWeighted(upscaled, 1.5, blurred, -0.5, 0)
+
+
+@register_upscaler('edge')
+def edge_aware_upscale(frame, size):
+    """Lanczos resampling with edge-preserving bilateral sharpening"""
+    upscaled = cv2.resize(frame, size, interpolation=cv2.INTER_LANCZOS4)
+    smoothed = cv2.bilateralFilter(upscaled, d=5, sigmaColor=40, sigmaSpace=5)
+    detail = cv2.subtract(upscaled, smoothed)
+    return cv2.add(upscaled, detail)
+
+
+# dnn_superres models are not thread-safe; every post-processing thread gets its own
+_sr_models = threading.local()
+
+
+def _load_sr_model(model_path):
+    """Load this thread's OpenCV dnn_superres model (ESPCN/FSRCNN/EDSR/LapSRN) from its file name"""
+    model = getattr(_sr_models, 'model', None)
+    if model is None:
+        name = os.path.basename(model_path).split('_')[0].lower()
+        scale = int(''.join(ch for ch in os.path.basename(model_path).split('_')[-1] if ch.isdigit()))
+        model = cv2.dnn_superres.DnnSuperResImpl_create()
+        model.readModel(model_path)
+        model.setModel(name, scale)
+        _sr_models.model = model
+    return model
+
+
+# Model upscaler, available when opencv-contrib is installed and SR_MODEL_PATH
+# points at a model file such as FSRCNN_x2.pb
+SR_MODEL_PATH = os.getenv('SR_MODEL_PATH', '')
+if SR_MODEL_PATH and hasattr(cv2, 'dnn_superres'):
+    @register_upscaler('model')
+    def model_upscale(frame, size):
+        """Super-resolve with the configured model, then fit to the exact size"""
+        upscaled = _load_sr_model(SR_MODEL_PATH).upsample(frame)
+        if (upscaled.shape[1], upscaled.shape[0]) != tuple(size):
+            upscaled = cv2.resize(upscaled, size, interpolation=cv2.INTER_AREA)
+        return upscaled
+
+
+def upscale_frames(frames, size, method='lanczos'):
+    """Upscale every frame to size=(width, height), returns a (T, H, W, 3) uint8 array"""
+    frames = to_uint8_array(frames)
+    if (frames.shape[2], frames.shape[1]) == tuple(size):
+        return frames
+
+    upscaler = UPSCALERS.get(method)
+    if upscaler is None:
+        print(f"⚠️ Unknown upscaler '{method}', falling back to lanczos")
+        upscaler = UPSCALERS['lanczos']
+    output = np.empty((len(frames), size[1], size[0], frames.shape[3]), dtype=np.uint8)
+    for i, frame in enumerate(frames):
+        output[i] = upscaler(frame, tuple(size))
+    return output
+
+
+def scaled_size(width, height, target_area, multiple=2):
+    """Size with the same aspect ratio covering target_area, rounded to a multiple"""
+    scale = np.sqrt(target_area / float(width * height))
+    return (
+        int(round(width * scale)) // multiple * multiple,
+        int(round(height * scale)) // multiple * multiple
+    )
+
+
+# Approximate latent -> RGB projections, keyed by latent channel count.
+# SDXL factors are the widely used linear fit of the SDXL VAE decoder.
+LATENT_RGB_FACTORS = {
+    4: (
+        np.array([
+            [0.3651, 0.4232, 0.4341],
+            [-0.2533, -0.0042, 0.1068],
+            [0.1076, 0.1111, -0.0362],
+            [-0.3165, -0.2492, -0.2188]
+        ], dtype=np.float32),
+        np.array([0.1084, -0.0175, -0.0011], dtype=np.float32)
+    )
+}
+
+
+def latents_to_preview_jpeg(latent, max_size=256, quality=70):
+    """Turn a single (C, H, W) latent array into a small JPEG thumbnail.
+
+    Uses a linear latent -> RGB projection when one is known for the channel
+    count, otherwise projects onto the three principal channel components.
+    """
+    channels = latent.shape[0]
+    flat = latent.reshape(channels, -1).astype(np.float32)
+
+    if channels in LATENT_RGB_FACTORS:
+        factors, bias = LATENT_RGB_FACTORS[channels]
+        rgb = flat.T @ factors + bias
+        rgb = (rgb + 1.0) / 2.0
+    else:
+        centered = flat - flat.mean(axis=1, keepdims=True)
+        _, _, components = np.linalg.svd(centered @ centered.T)
+        rgb = centered.T @ components[:3].T
+        low, high = np.percentile(rgb, 1, axis=0), np.percentile(rgb, 99, axis=0)
+        rgb = (rgb - low) / np.maximum(high - low, 1e-6)
+
+    image = (np.clip(rgb, 0, 1) * 255).astype(np.uint8).reshape(latent.shape[1], latent.shape[2], 3)
+    scale = max_size / float(max(image.shape[:2]))
+    size = (max(1, int(image.shape[1] * scale)), max(1, int(image.shape[0] * scale)))
+    image = cv2.resize(image, size, interpolation=cv2.INTER_LINEAR)
+    ok, encoded = cv2.imencode('.jpg', cv2.cvtColor(image, cv2.COLOR_RGB2BGR), [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return encoded.tobytes() if ok else None
@@ -0,0 +1,40 @@
+"""
+Process-wide roles held with a non-blocking flock.
+Some background work (the retention collector, resuming interrupted render
+jobs) must run in exactly one process even when gunicorn starts several
+workers. The first process to claim a role keeps its lock file open until it
+exits; every other process sees the role as taken.
+"""
+
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # No flock (Windows): every process holds every role
+    fcntl = None
+
+PROCESS_LOCK_DIR = os.getenv('PROCESS_LOCK_DIR', 'data')
+
+_held = {}
+_held_lock = threading.Lock()
+
+
+def claim(role):
+    """Whether this process holds role, claiming it if no other process does"""
+    with _held_lock:
+        if role in _held:
+            return True
+        if fcntl is None:
+            _held[role] = None
+            return True
+        os.makedirs(PROCESS_LOCK_DIR, exist_ok=True)
+        fd = os.open(os.path.join(PROCESS_LOCK_DIR, f"{role}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        _held[role] = fd
+        return True
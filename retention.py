@@ -0,0 +1,213 @@
+"""
+Background retention collector for generated files.
+Removes orphaned scene images, posters (with their thumbnail/WebP/AVIF
+derivatives), clips, videos and their history artifacts (poster frame,
+hover preview, seek sprites) that no saved movie references, stale job
+workspaces and finished job records, and optionally applies an age limit
+and a disk quota to the movie history (oldest first).
+"""
+
+import os
+import re
+import time
+import shutil
+import threading
+
+import job_store
+import process_lock
+from derivatives import source_name
+from movie_store import load_movies, delete_movies
+from storage import get_storage
+
+# Files in the output folder the collector is allowed to delete
+MANAGED_FILE_PATTERN = re.compile(
+    r'^((scene|poster)_.+\.(jpg|webp|avif)|(.+_)?clip_\d+(_[0-9a-f]{8})?\.mp4|[0-9a-f-]{36}(_[0-9a-f]{8})?'
+    r'(_poster\.jpg|_preview\.mp4|_sprites\.(jpg|vtt)|\.mp4))$'
+)
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _remove_file(path, report):
+    size = _file_size(path)
+    try:
+        os.remove(path)
+    except OSError:
+        return
+    report['files_removed'] += 1
+    report['bytes_reclaimed'] += size
+
+
+def _remove_tree(path, report):
+    size = sum(
+        _file_size(os.path.join(root, name))
+        for root, _, names in os.walk(path) for name in names
+    )
+    shutil.rmtree(path, ignore_errors=True)
+    if not os.path.exists(path):
+        report['workspaces_removed'] += 1
+        report['bytes_reclaimed'] += size
+
+
+def referenced_files(movie):
+    """Base names of every managed file a movie record points at"""
+    names = set()
+    pending = [movie]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, dict):
+            pending.extend(value.values())
+        elif isinstance(value, list):
+            pending.extend(value)
+        elif isinstance(value, str):
+            name = os.path.basename(value.split('?', 1)[0])
+            if MANAGED_FILE_PATTERN.match(name):
+                names.add(name)
+    return names
+
+
+def managed_files(output_dir):
+    """(path, size, mtime) of every managed file in the output folder"""
+    files = []
+    if not os.path.isdir(output_dir):
+        return files
+    for name in os.listdir(output_dir):
+        if not MANAGED_FILE_PATTERN.match(name):
+            continue
+        path = os.path.join(output_dir, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        files.append((path, stat.st_size, stat.st_mtime))
+    return files
+
+
+def _expire_movies(movies, output_dir, max_age, quota_bytes, report):
+    """Drop movies by age, then oldest-first until under quota; returns their file names"""
+    now = time.time()
+    movies = sorted(movies, key=lambda m: m.get('created_at', 0))
+    expired = []
+
+    if max_age:
+        expired = [m for m in movies if now - m.get('created_at', now) > max_age]
+
+    if quota_bytes:
+        sizes = {os.path.basename(path): size for path, size, _ in managed_files(output_dir)}
+        total = sum(sizes.values())
+        for movie in expired:
+            total -= sum(sizes.get(name, 0) for name in referenced_files(movie))
+        for movie in movies:
+            if total <= quota_bytes:
+                break
+            if movie in expired:
+                continue
+            expired.append(movie)
+            total -= sum(sizes.get(name, 0) for name in referenced_files(movie))
+
+    released = set()
+    if expired:
+        removed = delete_movies([m['id'] for m in expired])
+        report['movies_removed'] = len(removed)
+        for movie in removed:
+            released |= referenced_files(movie)
+            if movie.get('storage') == 's3' and movie.get('video_key'):
+                get_storage().delete(movie['video_key'])
+    return released
+
+
+def collect(output_dir, max_age=0, quota_bytes=0, orphan_grace=24 * 3600):
+    """Run one collection pass and return a report of what was removed.
+
+    max_age (seconds) and quota_bytes limit the movie history when non-zero.
+    Unreferenced files and workspaces are only removed once they are older
+    than orphan_grace, so images of a movie still being created survive.
+    """
+    started = time.time()
+    report = {
+        'files_removed': 0,
+        'workspaces_removed': 0,
+        'jobs_removed': 0,
+        'movies_removed': 0,
+        'bytes_reclaimed': 0
+    }
+
+    released = set()
+    if max_age or quota_bytes:
+        released = _expire_movies(load_movies(), output_dir, max_age, quota_bytes, report)
+
+    referenced = set()
+    for movie in load_movies():
+        referenced |= referenced_files(movie)
+
+    # Unfinished jobs still need their input images and checkpointed clips
+    active_jobs = set()
+    for job in job_store.list_jobs():
+        if job.get('status') in job_store.UNFINISHED_STATUSES:
+            active_jobs.add(job['id'])
+            referenced |= referenced_files(job.get('request', {}).get('scene_images', []))
+        elif started - job.get('updated_at', started) > orphan_grace:
+            if job_store.delete_job(job['id']):
+                report['jobs_removed'] += 1
+
+    for path, size, mtime in managed_files(output_dir):
+        name = os.path.basename(path)
+        # Derivatives live as long as their original
+        source = source_name(name)
+        if name in referenced or source in referenced:
+            continue
+        if name in released or source in released or started - mtime > orphan_grace:
+            _remove_file(path, report)
+
+    if os.path.isdir(job_store.SCRATCH_DIR):
+        for name in os.listdir(job_store.SCRATCH_DIR):
+            path = os.path.join(job_store.SCRATCH_DIR, name)
+            if name in active_jobs or not os.path.isdir(path):
+                continue
+            try:
+                if started - os.path.getmtime(path) <= orphan_grace:
+                    continue
+            except OSError:
+                continue
+            _remove_tree(path, report)
+
+    report['seconds'] = round(time.time() - started, 2)
+    print(
+        f"🧹 Retention pass: {report['files_removed']} files, "
+        f"{report['workspaces_removed']} workspaces, {report['movies_removed']} movies removed, "
+        f"{report['bytes_reclaimed'] / 1024 / 1024:.1f} MB reclaimed"
+    )
+    return report
+
+
+_collector_thread = None
+
+
+def start_collector(interval, **options):
+    """Run collect(**options) every interval seconds on a daemon thread (once per process).
+    
+    Every web worker starts the thread, but only the process holding the
+    'retention' role collects; the others take over if it exits.
+    """
+    global _collector_thread
+    if _collector_thread is not None or interval <= 0:
+        return _collector_thread
+
+    def run():
+        while True:
+            time.sleep(interval)
+            if not process_lock.claim('retention'):
+                continue
+            try:
+                collect(**options)
+            except Exception as e:
+                print(f"⚠️ Retention pass failed: {e}")
+
+    _collector_thread = threading.Thread(target=run, name='retention', daemon=True)
+    _collector_thread.start()
+    return _collector_thread
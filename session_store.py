@@ -0,0 +1,197 @@
+"""
+Server-side session storage for Flask.
+Only a random session ID travels in the cookie; the session contents
+(movie_data, scenes, ...) live in a filesystem or SQLite backend with TTL
+eviction, so they can be shared by several worker processes.
+"""
+
+import os
+import re
+import json
+import time
+import secrets
+import sqlite3
+import threading
+
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+# Session IDs are secrets.token_urlsafe(32); anything else in a cookie is refused
+SID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{43}$')
+
+
+def valid_sid(sid):
+    return isinstance(sid, str) and SID_PATTERN.match(sid) is not None
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Session dict that remembers its ID and whether it was modified"""
+
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(session):
+            session.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+
+
+class FileSystemSessionBackend:
+    """One JSON file per session; expiry is taken from the file modification time"""
+
+    def __init__(self, directory, ttl):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, sid):
+        # The sid becomes a file name, so it must never carry path components
+        if not valid_sid(sid):
+            raise ValueError(f"Invalid session ID: {sid!r}")
+        return os.path.join(self.directory, f"{sid}.json")
+
+    def get(self, sid):
+        try:
+            path = self._path(sid)
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                self.delete(sid)
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, sid, data):
+        path = self._path(sid)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def delete(self, sid):
+        try:
+            os.remove(self._path(sid))
+        except (OSError, ValueError):
+            pass
+
+    def evict_expired(self):
+        """Remove expired session files, returns how many were removed"""
+        removed = 0
+        cutoff = time.time() - self.ttl
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+
+class SQLiteSessionBackend:
+    """Sessions in a single SQLite table, safe to share between processes"""
+
+    def __init__(self, path, ttl):
+        self.path = path
+        self.ttl = ttl
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS sessions ('
+                'sid TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires)')
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def get(self, sid):
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT data FROM sessions WHERE sid = ? AND expires > ?', (sid, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, sid, data):
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO sessions (sid, data, expires) VALUES (?, ?, ?)',
+                (sid, json.dumps(data, ensure_ascii=False), time.time() + self.ttl)
+            )
+
+    def delete(self, sid):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+
+    def evict_expired(self):
+        """Remove expired sessions, returns how many were removed"""
+        with self._connect() as conn:
+            return conn.execute('DELETE FROM sessions WHERE expires <= ?', (time.time(),)).rowcount
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Flask session interface that keeps only the session ID in the cookie"""
+
+    def __init__(self, backend, evict_interval=300):
+        self.backend = backend
+        self.evict_interval = evict_interval
+        self._last_eviction = 0
+        self._eviction_lock = threading.Lock()
+
+    def _maybe_evict(self):
+        now = time.time()
+        if now - self._last_eviction < self.evict_interval:
+            return
+        with self._eviction_lock:
+            if now - self._last_eviction < self.evict_interval:
+                return
+            self._last_eviction = now
+        removed = self.backend.evict_expired()
+        if removed:
+            print(f"🧹 Evicted {removed} expired sessions")
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if valid_sid(sid):
+            data = self.backend.get(sid)
+            if data is not None:
+                return ServerSideSession(data, sid=sid)
+        return ServerSideSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.modified and not session.new:
+                self.backend.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        if session.modified:
+            self.backend.set(session.sid, dict(session))
+            self._maybe_evict()
+            response.set_cookie(
+                name,
+                session.sid,
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app)
+            )
+
+
+def create_session_interface(backend_type, ttl, directory='data/sessions', db_path='data/sessions.db'):
+    """Build a server-side session interface, or None to keep Flask's cookie sessions"""
+    if backend_type == 'filesystem':
+        return ServerSideSessionInterface(FileSystemSessionBackend(directory, ttl))
+    if backend_type == 'sqlite':
+        return ServerSideSessionInterface(SQLiteSessionBackend(db_path, ttl))
+    if backend_type != 'cookie':
+        print(f"⚠️ Unknown session backend '{backend_type}', using signed cookies")
+    return None
@@ -8,6 +8,9 @@ let movieData = {};
 let scenes = [];
 let images = [];
 let videoPath = '';
+let videoId = '';
+let videoPreset = '';
+let activeJobId = null;
 
 // Initialize on page load
 document.addEventListener('DOMContentLoaded', function() {
@@ -21,6 +24,71 @@ document.addEventListener('DOMContentLoaded', function() {
     setupStickyElements();
 });
 
+// Cancel any running render when the tab is closed so the GPU is released
+window.addEventListener('beforeunload', function() {
+    if (activeJobId) {
+        navigator.sendBeacon(`/api/jobs/${activeJobId}/cancel`);
+    }
+});
+
+// Create a client-side job id so progress can be polled while the request runs
+function newJobId() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    // The server only accepts UUIDs; build a version 4 one by hand
+    return 'xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx'.replace(/[xy]/g, (c) => {
+        const r = Math.random() * 16 | 0;
+        return (c === 'x' ? r : (r & 0x3) | 0x8).toString(16);
+    });
+}
+
+// Poll real step-level progress of a render job
+function pollJobProgress(jobId, onProgress) {
+    const timer = setInterval(async () => {
+        try {
+            const response = await fetch(`/api/jobs/${jobId}`);
+            if (!response.ok) {
+                return;
+            }
+            const data = await response.json();
+            if (data.success) {
+                onProgress(data.job);
+                if (data.job.status !== 'running' && data.job.status !== 'queued') {
+                    clearInterval(timer);
+                }
+            }
+        } catch (error) {
+            console.warn('Progress poll failed:', error);
+        }
+    }, 1000);
+    return timer;
+}
+
+// Show the latest latent preview thumbnail of a job
+function updateRenderPreview(job) {
+    const preview = document.getElementById('renderPreview');
+    if (!preview || !job.preview_step || preview.dataset.step == job.preview_step) {
+        return;
+    }
+    preview.dataset.step = job.preview_step;
+    preview.src = `/api/jobs/${job.job_id}/preview.jpg?step=${job.preview_step}`;
+    preview.style.display = 'block';
+}
+
+// Cancel the active render job
+async function cancelRender() {
+    if (!activeJobId) {
+        return;
+    }
+    document.getElementById('videoGenSubtitle').textContent = 'Cancelling render...';
+    try {
+        await fetch(`/api/jobs/${activeJobId}/cancel`, { method: 'POST' });
+    } catch (error) {
+        console.error('Cancel failed:', error);
+    }
+}
+
 // Setup keyboard navigation
 function setupKeyboardNavigation() {
     document.addEventListener('keydown', function(e) {
@@ -653,12 +721,13 @@ function displayScript(scriptText) {
     scenes.forEach((scene, index) => {
         console.log(`   📝 Displaying Scene ${index + 1}:`, scene);
         html += `
-            <div class="scene-block-new">
+            <div class="scene-block-new" id="script-scene-${index}">
                 <h3 class="scene-title-new">${scene.title || `Scene ${scene.id}`}</h3>
                 <p class="scene-content">${scene.content}</p>
                 <div class="scene-meta">
                     <span class="scene-genre">🎬 ${movieData.genre}</span>
                     <span class="scene-style">🎨 ${movieData.style}</span>
+                    <button class="btn-scene" onclick="regenerateScene(${index})">✏️ Rewrite</button>
                 </div>
             </div>
         `;
@@ -669,6 +738,38 @@ function displayScript(scriptText) {
     console.log(`✅ Script display completed with ${scenes.length} scenes`);
 }
 
+// Rewrite one scene, keeping the rest of the script
+async function regenerateScene(index) {
+    const block = document.getElementById(`script-scene-${index}`);
+    const content = block.querySelector('.scene-content');
+    const button = block.querySelector('.btn-scene');
+    button.disabled = true;
+    content.style.opacity = '0.5';
+    
+    try {
+        const response = await fetch('/regenerate_scene', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ scene_id: scenes[index].id })
+        });
+        const data = await response.json();
+        
+        if (data.success) {
+            scenes[index] = data.scene;
+            content.textContent = data.scene.content;
+        } else {
+            alert(data.error || 'Failed to rewrite scene');
+        }
+    } catch (error) {
+        alert('Error: ' + error.message);
+    } finally {
+        button.disabled = false;
+        content.style.opacity = '1';
+    }
+}
+
 // Regenerate script
 function regenerateScript() {
     document.getElementById('scriptContainer').innerHTML = '';
@@ -743,7 +844,7 @@ async function generateImages() {
             
             if (data.success) {
                 images.push(data.image_path);
-                updateSceneCard(i, scenes[i], data.image_path, 'success');
+                updateSceneCard(i, scenes[i], data.image_path, 'success', null, data.variants);
                 console.log(data.message || `Scene ${i + 1} image generated successfully`);
             } else {
                 let errorMsg = data.error || 'Image generation failed';
@@ -776,8 +877,30 @@ async function generateImages() {
     }, 1000);
 }
 
+// Scene image as a WebP thumbnail, falling back to the original JPEG
+function sceneImageHtml(imagePath, variants, alt) {
+    const webp = variants && variants.webp;
+    if (!webp || !webp['512']) {
+        return `<img src="${imagePath}" alt="${alt}" class="scene-image" />`;
+    }
+    return `<img src="${webp['512']}" alt="${alt}" class="scene-image"
+                 data-original="${imagePath}" onerror="imageFallback(this)" />`;
+}
+
+// Derivatives are written just after the image; retry once, then use the original
+function imageFallback(img) {
+    if (!img.dataset.retried) {
+        img.dataset.retried = '1';
+        const src = img.src;
+        setTimeout(() => { img.src = src + '?retry=1'; }, 1000);
+        return;
+    }
+    img.onerror = null;
+    img.src = img.dataset.original;
+}
+
 // Update scene card
-function updateSceneCard(index, scene, imagePath, status, error = null) {
+function updateSceneCard(index, scene, imagePath, status, error = null, variants = null) {
     const card = document.getElementById(`scene-card-${index}`);
     
     if (status === 'success') {
@@ -786,7 +909,7 @@ function updateSceneCard(index, scene, imagePath, status, error = null) {
                 <div class="scene-title-new">${scene.title || `Scene ${scene.id}`}</div>
                 <div class="scene-number-new">Scene ${scene.id} of ${scenes.length}</div>
             </div>
-            <img src="${imagePath}" alt="Scene ${scene.id}" class="scene-image" />
+            ${sceneImageHtml(imagePath, variants, `Scene ${scene.id}`)}
             <div class="scene-actions">
                 <button class="btn-scene" onclick="regenerateImage(${index})">🔄 Regenerate</button>
                 <button class="btn-scene" onclick="approveImage(${index})">✓ Approve</button>
@@ -840,7 +963,7 @@ async function regenerateImage(index) {
         
         if (data.success) {
             images[index] = data.image_path;
-            updateSceneCard(index, scenes[index], data.image_path, 'success');
+            updateSceneCard(index, scenes[index], data.image_path, 'success', null, data.variants);
         } else {
             updateSceneCard(index, scenes[index], null, 'error', data.error);
         }
@@ -858,14 +981,17 @@ async function generateVideo() {
     const videoProgress = document.getElementById('videoProgress');
     const videoGenSubtitle = document.getElementById('videoGenSubtitle');
     
-    let progressPercent = 0;
-    const progressInterval = setInterval(() => {
-        progressPercent += 2;
-        videoProgress.style.width = progressPercent + '%';
-        if (progressPercent >= 90) {
-            clearInterval(progressInterval);
+    activeJobId = newJobId();
+    videoProgress.style.width = '0%';
+    const progressTimer = pollJobProgress(activeJobId, job => {
+        videoProgress.style.width = job.percent + '%';
+        updateRenderPreview(job);
+        if (job.status === 'queued' && job.queue_position) {
+            videoGenSubtitle.textContent = `Waiting for the GPU (position ${job.queue_position} in queue)...`;
+        } else if (job.status === 'running' && job.current_scene) {
+            videoGenSubtitle.textContent = `Rendering scene ${job.current_scene} of ${job.total_scenes} (${Math.round(job.percent)}%)...`;
         }
-    }, 150);
+    });
     
     try {
         const response = await fetch('/generate_video', {
@@ -875,23 +1001,31 @@ async function generateVideo() {
             },
             body: JSON.stringify({
                 images: images,
-                movie_data: movieData
+                movie_data: movieData,
+                preset: 'draft',
+                job_id: activeJobId,
+                previews: true
             })
         });
         
-        clearInterval(progressInterval);
+        clearInterval(progressTimer);
+        activeJobId = null;
         videoProgress.style.width = '100%';
         
         const data = await response.json();
         
         if (data.success) {
             videoPath = data.video_path;
+            videoId = data.video_id;
+            videoPreset = data.preset;
             videoGenSubtitle.textContent = data.message || '✓ Video generation complete!';
             
             setTimeout(() => {
                 showSection('Result');
                 displayVideo();
             }, 1000);
+        } else if (data.status === 'CANCELLED') {
+            videoGenSubtitle.textContent = 'Video generation cancelled.';
         } else {
             document.getElementById('scriptGenTitle').textContent = 'Video Generation Failed';
             let errorMsg = data.error || 'Video generation failed';
@@ -901,7 +1035,8 @@ async function generateVideo() {
             videoGenSubtitle.textContent = errorMsg;
         }
     } catch (error) {
-        clearInterval(progressInterval);
+        clearInterval(progressTimer);
+        activeJobId = null;
         document.getElementById('scriptGenTitle').textContent = 'Error Generating Video';
         videoGenSubtitle.textContent = 'Error: ' + error.message;
     }
@@ -917,14 +1052,103 @@ function displayVideo() {
         </video>
         <div style="margin-top: 2rem;">
             <h3 style="color: var(--primary); font-size: 2rem;">${movieData.title}</h3>
-            <p style="color: var(--text-muted); font-size: 1.1rem;">${movieData.genre} • ${movieData.style}</p>
+            <p style="color: var(--text-muted); font-size: 1.1rem;">${movieData.genre} • ${movieData.style} • ${videoPreset === 'draft' ? 'Draft preview' : 'Final quality'}</p>
         </div>
     `;
 }
 
-// Other functions
-function generatePoster() {
-    alert('Poster generation feature coming soon!');
+// Re-render the approved draft at final quality
+async function promoteVideo() {
+    if (!videoId) {
+        return;
+    }
+    if (videoPreset === 'final') {
+        alert('This movie is already rendered at final quality.');
+        return;
+    }
+    
+    showSection('Video');
+    const videoProgress = document.getElementById('videoProgress');
+    const videoGenSubtitle = document.getElementById('videoGenSubtitle');
+    videoProgress.style.width = '0%';
+    videoGenSubtitle.textContent = 'Rendering your approved draft at final quality...';
+    
+    activeJobId = newJobId();
+    const progressTimer = pollJobProgress(activeJobId, job => {
+        videoProgress.style.width = job.percent + '%';
+        updateRenderPreview(job);
+    });
+    
+    try {
+        const response = await fetch(`/api/movies/${videoId}/promote`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ job_id: activeJobId, previews: true })
+        });
+        const data = await response.json();
+        clearInterval(progressTimer);
+        activeJobId = null;
+        videoProgress.style.width = '100%';
+        
+        if (data.success) {
+            videoPath = data.video_path;
+            videoId = data.video_id;
+            videoPreset = data.preset;
+            videoGenSubtitle.textContent = data.message || '✓ Final render complete!';
+            
+            setTimeout(() => {
+                showSection('Result');
+                displayVideo();
+            }, 1000);
+        } else {
+            videoGenSubtitle.textContent = data.error || 'Final render failed';
+        }
+    } catch (error) {
+        clearInterval(progressTimer);
+        activeJobId = null;
+        videoGenSubtitle.textContent = 'Error: ' + error.message;
+    }
+}
+
+// Compose a poster from the movie's scene images and show it under the video
+async function generatePoster() {
+    if (!videoId) {
+        return;
+    }
+    const container = document.getElementById('finalVideo');
+    let posterBox = document.getElementById('posterResult');
+    if (!posterBox) {
+        posterBox = document.createElement('div');
+        posterBox.id = 'posterResult';
+        posterBox.style.marginTop = '2rem';
+        container.appendChild(posterBox);
+    }
+    posterBox.innerHTML = '<p style="color: var(--text-muted);">🎨 Composing your poster...</p>';
+    
+    try {
+        const response = await fetch('/generate_poster', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({ movie_id: videoId })
+        });
+        const data = await response.json();
+        if (!data.success) {
+            posterBox.innerHTML = `<p style="color: var(--text-muted);">${data.error || 'Poster generation failed'}</p>`;
+            return;
+        }
+        posterBox.innerHTML = `
+            <a href="${data.poster_path}" target="_blank" rel="noopener">
+                ${sceneImageHtml(data.poster_path, data.variants, movieData.title + ' poster')}
+            </a>
+        `;
+        const img = posterBox.querySelector('img');
+        img.style.maxWidth = '360px';
+        img.style.borderRadius = '12px';
+    } catch (error) {
+        posterBox.innerHTML = `<p style="color: var(--text-muted);">Error: ${error.message}</p>`;
+    }
 }
 
 function downloadVideo() {
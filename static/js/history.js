@@ -45,6 +45,44 @@ function displayMovies() {
     emptyState.style.display = 'none';
     
     grid.innerHTML = filteredMovies.map(movie => createMovieCard(movie)).join('');
+    grid.querySelectorAll('.movie-thumbnail[data-preview]').forEach(setupHoverPreview);
+}
+
+// Smallest WebP thumbnail of the first scene image, if the movie has one
+function moviePosterUrl(movie) {
+    const variants = (movie.image_variants || [])[0] || {};
+    const webp = variants.webp || {};
+    return webp['512'] || webp['256'] || (movie.images || [])[0] || '';
+}
+
+// Poster frame rendered with the movie, else the first scene thumbnail
+function movieCoverUrl(movie) {
+    return (movie.artifacts && movie.artifacts.poster) || moviePosterUrl(movie);
+}
+
+// Play the short low-bitrate preview while the card is hovered; the full
+// video is only loaded from the details modal
+function setupHoverPreview(thumbnail) {
+    thumbnail.addEventListener('mouseenter', () => {
+        if (thumbnail.querySelector('video')) return;
+        const video = document.createElement('video');
+        video.src = thumbnail.dataset.preview;
+        video.muted = true;
+        video.loop = true;
+        video.playsInline = true;
+        video.className = 'hover-preview';
+        thumbnail.insertBefore(video, thumbnail.querySelector('.play-overlay'));
+        thumbnail.classList.add('previewing');
+        video.play().catch(() => {});
+    });
+    thumbnail.addEventListener('mouseleave', () => {
+        const video = thumbnail.querySelector('video');
+        if (video) {
+            video.pause();
+            video.remove();
+        }
+        thumbnail.classList.remove('previewing');
+    });
 }
 
 // Create movie card HTML
@@ -56,10 +94,8 @@ function createMovieCard(movie) {
     return `
         <div class="movie-card" data-movie-id="${movie.id}">
             <div class="movie-poster">
-                <div class="movie-thumbnail">
-                    <video preload="metadata" muted>
-                        <source src="${movie.video_url}" type="video/mp4">
-                    </video>
+                <div class="movie-thumbnail" ${movie.artifacts && movie.artifacts.preview ? `data-preview="${movie.artifacts.preview}"` : ''}>
+                    <img src="${movieCoverUrl(movie)}" alt="${movie.title}" loading="lazy">
                     <div class="play-overlay">
                         <span class="play-icon">▶️</span>
                     </div>
@@ -103,6 +139,12 @@ function createMovieCard(movie) {
                         <span class="btn-icon">📥</span>
                         Download
                     </button>
+                    ${movie.preset === 'draft' && !movie.promoted_to ? `
+                        <button class="btn-action btn-promote" onclick="promoteMovie('${movie.id}')">
+                            <span class="btn-icon">✨</span>
+                            Render Final
+                        </button>
+                    ` : ''}
                     <button class="btn-action btn-delete" onclick="deleteMovie('${movie.id}')">
                         <span class="btn-icon">🗑️</span>
                         Delete
@@ -186,9 +228,10 @@ function showMovieModal(movie) {
         <div class="movie-details">
             <div class="movie-header">
                 <div class="movie-poster-large">
-                    <video controls preload="metadata">
+                    <video controls preload="none" poster="${movieCoverUrl(movie)}">
                         <source src="${movie.video_url}" type="video/mp4">
                     </video>
+                    ${movie.artifacts && movie.artifacts.sprites_vtt ? '<div class="seek-strip" id="seekStrip"></div>' : ''}
                 </div>
                 <div class="movie-info-large">
                     <h3>${movie.title}</h3>
@@ -245,6 +288,46 @@ function showMovieModal(movie) {
     `;
     
     modal.style.display = 'block';
+    loadSeekStrip(movie);
+}
+
+// Parse the sprite WebVTT index into [{start, url, x, y, w, h}]
+function parseSpriteVtt(text, vttUrl) {
+    const base = new URL(vttUrl, window.location.href);
+    const toSeconds = stamp => stamp.trim().split(':').reduce((total, part) => total * 60 + parseFloat(part), 0);
+    return text.split(/\r?\n\r?\n/).map(block => {
+        const lines = block.trim().split(/\r?\n/);
+        const timing = lines.findIndex(line => line.includes('-->'));
+        if (timing < 0 || !lines[timing + 1]) return null;
+        const [image, fragment] = lines[timing + 1].split('#xywh=');
+        if (!fragment) return null;
+        const [x, y, w, h] = fragment.split(',').map(Number);
+        return { start: toSeconds(lines[timing].split('-->')[0]), url: new URL(image, base).href, x, y, w, h };
+    }).filter(Boolean);
+}
+
+// Seek thumbnails from the sprite sheet, clicking one starts the video there
+async function loadSeekStrip(movie) {
+    const strip = document.getElementById('seekStrip');
+    if (!strip) return;
+    try {
+        const response = await fetch(movie.artifacts.sprites_vtt);
+        const cues = parseSpriteVtt(await response.text(), movie.artifacts.sprites_vtt);
+        strip.innerHTML = cues.map(cue => `
+            <button class="seek-thumb" title="${formatDuration(cue.start)}" onclick="seekMovie(${cue.start})"
+                style="width: ${cue.w}px; height: ${cue.h}px; background-image: url('${cue.url}'); background-position: -${cue.x}px -${cue.y}px;"></button>
+        `).join('');
+    } catch (error) {
+        console.error('❌ Error loading seek thumbnails:', error);
+        strip.remove();
+    }
+}
+
+function seekMovie(seconds) {
+    const video = document.querySelector('.movie-poster-large video');
+    if (!video) return;
+    video.currentTime = seconds;
+    video.play().catch(() => {});
 }
 
 // Close modal
@@ -265,6 +348,27 @@ function downloadMovie(movieId) {
     document.body.removeChild(link);
 }
 
+// Re-render a draft movie at final quality
+async function promoteMovie(movieId) {
+    try {
+        console.log(`✨ Promoting draft movie: ${movieId}`);
+        const response = await fetch(`/api/movies/${movieId}/promote`, {
+            method: 'POST'
+        });
+        const data = await response.json();
+        
+        if (data.success) {
+            showSuccess(data.message || 'Final render completed');
+            loadMovies();
+        } else {
+            showError('Failed to render final quality: ' + data.error);
+        }
+    } catch (error) {
+        console.error('❌ Error promoting movie:', error);
+        showError('Error rendering final quality: ' + error.message);
+    }
+}
+
 // Delete movie
 async function deleteMovie(movieId) {
     if (!confirm('Are you sure you want to delete this movie? This action cannot be undone.')) {
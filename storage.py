@@ -0,0 +1,175 @@
+"""
+Video storage backends.
+LocalStorage keeps videos in a directory (static/output or a mounted cloud
+volume); S3Storage uploads them to any S3-compatible service (AWS, MinIO, ...)
+on a background pool and serves them through presigned URLs. Renders always
+write to a local file first, so the render worker never waits on the upload.
+"""
+
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class LocalStorage:
+    """Videos stored as files under a root directory and streamed by Flask"""
+
+    name = 'local'
+
+    def __init__(self, root, url_prefix=None):
+        self.root = root
+        self.url_prefix = url_prefix
+        try:
+            os.makedirs(root, exist_ok=True)
+        except OSError as e:
+            print(f"⚠️ Video storage directory {root} is not available: {e}")
+
+    def local_path(self, key):
+        return os.path.join(self.root, key)
+
+    def exists(self, key):
+        return os.path.exists(self.local_path(key))
+
+    def upload_async(self, path, key, on_done=None):
+        """Move a rendered file into place (nothing to upload), returns None"""
+        target = self.local_path(key)
+        if os.path.abspath(path) != os.path.abspath(target):
+            shutil.move(path, target)
+        if on_done:
+            on_done(key, None)
+        return None
+
+    def signed_url(self, key, download_name=None):
+        """Local files are served by the app itself"""
+        return None
+
+    def delete(self, key):
+        try:
+            os.remove(self.local_path(key))
+            return True
+        except OSError:
+            return False
+
+
+class S3Storage:
+    """Videos stored in an S3-compatible bucket with background multipart uploads"""
+
+    name = 's3'
+
+    def __init__(self, bucket, staging_dir, prefix='', endpoint_url=None, region=None,
+                 url_expires=3600, multipart_threshold_mb=16, multipart_chunk_mb=16,
+                 upload_workers=2, keep_local=False):
+        # boto3 is only needed when the S3 backend is selected
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config
+
+        self.bucket = bucket
+        self.staging_dir = staging_dir
+        self.prefix = prefix.strip('/')
+        self.url_expires = url_expires
+        self.keep_local = keep_local
+        self.client = boto3.client(
+            's3',
+            endpoint_url=endpoint_url or None,
+            region_name=region or None,
+            # Path-style addressing works with MinIO and other local stand-ins
+            config=Config(s3={'addressing_style': 'path'}, signature_version='s3v4')
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold_mb * 1024 * 1024,
+            multipart_chunksize=multipart_chunk_mb * 1024 * 1024,
+            max_concurrency=4,
+            use_threads=True
+        )
+        self.executor = ThreadPoolExecutor(max_workers=upload_workers, thread_name_prefix='upload')
+        os.makedirs(staging_dir, exist_ok=True)
+
+    def _object_key(self, key):
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def local_path(self, key):
+        """Staging copy of a video, present while (or if) it is kept locally"""
+        return os.path.join(self.staging_dir, key)
+
+    def exists(self, key):
+        from botocore.exceptions import ClientError
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except ClientError:
+            return False
+
+    def _upload(self, path, key, on_done):
+        error = None
+        try:
+            self.client.upload_file(path, self.bucket, self._object_key(key), Config=self.transfer_config,
+                                    ExtraArgs={'ContentType': 'video/mp4'})
+            print(f"☁️ Uploaded {key} to s3://{self.bucket}/{self._object_key(key)}")
+            if not self.keep_local:
+                os.remove(path)
+        except Exception as e:
+            error = str(e)
+            print(f"❌ Upload of {key} failed: {e}")
+        if on_done:
+            on_done(key, error)
+
+    def upload_async(self, path, key, on_done=None):
+        """Queue a multipart upload and return its future; on_done(key, error) runs when it ends"""
+        return self.executor.submit(self._upload, path, key, on_done)
+
+    def signed_url(self, key, download_name=None):
+        """Presigned GET URL, optionally forcing a download with the given file name"""
+        params = {'Bucket': self.bucket, 'Key': self._object_key(key)}
+        if download_name:
+            params['ResponseContentDisposition'] = f'attachment; filename="{download_name}"'
+        return self.client.generate_presigned_url('get_object', Params=params, ExpiresIn=self.url_expires)
+
+    def delete(self, key):
+        try:
+            self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except Exception as e:
+            print(f"⚠️ Could not delete {key} from S3: {e}")
+            return False
+
+
+def create_storage(storage_type, output_dir, cloud_path):
+    """Build the video storage backend for VIDEO_STORAGE_TYPE ('local', 'cloud' or 's3')"""
+    if storage_type == 's3':
+        return S3Storage(
+            bucket=os.getenv('S3_BUCKET', 'movies'),
+            staging_dir=output_dir,
+            prefix=os.getenv('S3_PREFIX', ''),
+            endpoint_url=os.getenv('S3_ENDPOINT_URL'),
+            region=os.getenv('S3_REGION'),
+            url_expires=int(os.getenv('S3_URL_EXPIRES', '3600')),
+            multipart_threshold_mb=int(os.getenv('S3_MULTIPART_THRESHOLD_MB', '16')),
+            multipart_chunk_mb=int(os.getenv('S3_MULTIPART_CHUNK_MB', '16')),
+            upload_workers=int(os.getenv('UPLOAD_WORKERS', '2')),
+            keep_local=os.getenv('S3_KEEP_LOCAL', '0') == '1'
+        )
+    if storage_type == 'cloud':
+        # Mounted cloud volume (e.g. a Lightning studio directory)
+        return LocalStorage(cloud_path)
+    if storage_type != 'local':
+        print(f"⚠️ Unknown video storage '{storage_type}', using local files")
+    return LocalStorage(output_dir, url_prefix='/static/output')
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage():
+    """Process-wide storage backend configured from the environment"""
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            _storage = create_storage(
+                os.getenv('VIDEO_STORAGE_TYPE', 'cloud'),
+                'static/output',
+                os.getenv('CLOUD_VIDEO_PATH', '/teamspace/studios/this_studio/movie/')
+            )
+        return _storage
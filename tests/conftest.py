@@ -0,0 +1,50 @@
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fake_backends
+
+
+def _serve(handler):
+    """Run handler on a free localhost port, returns (server, base URL)"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+@pytest.fixture
+def fake_gemini():
+    """Fake Gemini REST API; tests tune latency and error_rate on the returned handler class"""
+    class Handler(fake_backends.FakeGeminiHandler):
+        client = fake_backends.FakeGenaiClient(latency=0)
+        error_rate = 0.0
+
+    server, base_url = _serve(Handler)
+    Handler.base_url = base_url
+    yield Handler
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def fake_tts():
+    """Fake ElevenLabs text-to-speech API that counts the requests it answers"""
+    class Handler(fake_backends.FakeTTSHandler):
+        latency = 0
+        error_rate = 0.0
+        requests = 0
+
+        def do_POST(self):
+            type(self).requests += 1
+            super().do_POST()
+
+    server, base_url = _serve(Handler)
+    Handler.base_url = base_url
+    yield Handler
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,108 @@
+import json
+import threading
+import urllib.request
+from types import SimpleNamespace
+
+import pytest
+
+from fake_backends import FakeGenaiClient
+from gemini_client import GeminiClient, GeminiTimeout
+
+
+class RestModels:
+    """Minimal generate_content over the Gemini REST API (google-genai is not needed for the tests)"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def generate_content(self, model, contents, config=None):
+        body = json.dumps({'contents': [{'role': 'user', 'parts': [{'text': contents}]}]}).encode('utf-8')
+        request = urllib.request.Request(
+            f"{self.base_url}/v1beta/models/{model}:generateContent", data=body, method='POST',
+            headers={'Content-Type': 'application/json'}
+        )
+        # HTTPError carries the status as .code, like google-genai's APIError
+        with urllib.request.urlopen(request, timeout=10) as response:
+            payload = json.load(response)
+        usage = payload['usageMetadata']
+        return SimpleNamespace(
+            text=payload['candidates'][0]['content']['parts'][0]['text'],
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=usage['promptTokenCount'],
+                candidates_token_count=usage['candidatesTokenCount']
+            )
+        )
+
+
+def make_client(handler, **options):
+    options.setdefault('cache_ttl', 0)
+    options.setdefault('backoff_base', 0)
+    return GeminiClient(SimpleNamespace(models=RestModels(handler.base_url)), **options)
+
+
+def test_retries_injected_failures(fake_gemini):
+    fake_gemini.error_rate = 0.5
+    client = make_client(fake_gemini, max_retries=30)
+
+    responses = [client.generate_content('gemini-test', f"Write Scene 1 of movie {i}") for i in range(10)]
+
+    assert all(response.text for response in responses)
+    metrics = client.metrics()
+    assert metrics['errors'] == 0
+    assert metrics['retries'] > 0
+    assert metrics['api_requests'] == 10 + metrics['retries']
+
+
+def test_gives_up_after_max_retries(fake_gemini):
+    fake_gemini.error_rate = 1.0
+    client = make_client(fake_gemini, max_retries=2)
+
+    with pytest.raises(Exception) as error:
+        client.generate_content('gemini-test', 'prompt')
+
+    assert error.value.code in (429, 500, 503)
+    metrics = client.metrics()
+    assert (metrics['api_requests'], metrics['retries'], metrics['errors']) == (3, 2, 1)
+
+
+def test_cache_serves_repeated_prompts(fake_gemini):
+    client = make_client(fake_gemini, cache_ttl=60)
+
+    first = client.generate_content('gemini-test', 'same prompt')
+    second = client.generate_content('gemini-test', 'same prompt')
+
+    assert second is first
+    assert client.metrics()['api_requests'] == 1
+
+
+def test_times_out_slow_calls(fake_gemini):
+    fake_gemini.client = FakeGenaiClient(latency=0.5)
+    client = make_client(fake_gemini, timeout=0.1, max_retries=1)
+
+    with pytest.raises(GeminiTimeout):
+        client.generate_content('gemini-test', 'prompt')
+
+    metrics = client.metrics()
+    assert (metrics['timeouts'], metrics['abandoned'], metrics['api_requests']) == (2, 2, 2)
+
+
+def test_queued_calls_do_not_time_out(fake_gemini):
+    # Four calls through one slot: each waits for the others, but only its own
+    # 0.2s in flight counts towards the 0.5s timeout
+    fake_gemini.client = FakeGenaiClient(latency=0.2)
+    client = make_client(fake_gemini, max_concurrency=1, timeout=0.5, max_retries=0)
+    results = []
+
+    def call(i):
+        results.append(client.generate_content('gemini-test', f"prompt {i}").text)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 4
+    metrics = client.metrics()
+    assert (metrics['timeouts'], metrics['api_requests']) == (0, 4)
+
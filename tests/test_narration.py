@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+import narration
+
+
+@pytest.fixture
+def tts(fake_tts, tmp_path, monkeypatch):
+    monkeypatch.setattr(narration, 'ELEVENLABS_BASE_URL', fake_tts.base_url)
+    monkeypatch.setattr(narration, 'ELEVENLABS_API_KEY', 'test-key')
+    monkeypatch.setattr(narration, 'NARRATION_CACHE_DIR', str(tmp_path / 'tts_cache'))
+    return fake_tts
+
+
+def test_synthesize_caches_by_text_and_voice(tts):
+    first = narration.synthesize('The hero walks into the storm.', 'voice-a')
+    again = narration.synthesize('The hero walks into the storm.', 'voice-a')
+    other_voice = narration.synthesize('The hero walks into the storm.', 'voice-b')
+
+    assert again == first
+    assert other_voice != first
+    assert first.endswith('.wav') and os.path.getsize(first) > 0
+    assert tts.requests == 2
+    assert not [name for name in os.listdir(narration.NARRATION_CACHE_DIR) if name.endswith('.tmp')]
+
+
+def test_submit_narration_skips_scenes_without_text(tts):
+    scenes = [{'content': 'Scene 1: Opening\nThe city sleeps.'}, {'content': 'Scene 2: Empty\n'}]
+
+    futures = narration.submit_narration(scenes, 'voice-a')
+
+    assert futures[1] is None
+    assert futures[0].result(timeout=10) == narration.cached_audio('The city sleeps.', 'voice-a')
+
+
+def test_narration_text_drops_heading_and_fits_budget(monkeypatch):
+    monkeypatch.setattr(narration, 'NARRATION_WORDS_PER_SECOND', 2.0)
+    monkeypatch.setattr(narration, 'NARRATION_MAX_TEMPO', 1.0)
+    scene = {'content': 'Scene 3: The Chase\nShe runs. The storm breaks over the city tonight.'}
+
+    assert narration.narration_text(scene) == 'She runs. The storm breaks over the city tonight.'
+    # 2 words per second for 1.5s: the first sentence fits, the second does not
+    assert narration.narration_text(scene, max_seconds=1.5) == 'She runs.'
+
+
+def test_narration_filter_fits_tracks_to_clips(monkeypatch):
+    monkeypatch.setattr(narration, 'NARRATION_MAX_TEMPO', 1.3)
+    # Scene 1 is too long (sped up at most 1.3x, then trimmed), scene 2 has
+    # no narration, scene 3 is short (padded)
+    graph = narration.narration_filter([(1, 4.0), None, (2, 1.0)], [2.0, 1.5, 3.0])
+    chains = graph.split(';')
+
+    assert len(chains) == 4
+    assert chains[0].startswith('[1:a]aformat=sample_rates=44100:channel_layouts=stereo,atempo=1.3000,apad,atrim=0:2.000')
+    assert chains[0].endswith('afade=t=out:st=1.750:d=0.250[s0]')
+    assert chains[1] == 'anullsrc=r=44100:cl=stereo,atrim=0:1.500,asetpts=N/SR/TB[s1]'
+    assert chains[2].startswith('[2:a]') and 'atempo' not in chains[2] and 'atrim=0:3.000' in chains[2]
+    assert chains[3] == '[s0][s1][s2]concat=n=3:v=0:a=1[narration]'
@@ -0,0 +1,45 @@
+import numpy as np
+
+from postprocess import to_uint8_array, interpolate_frames, upscale_frames
+
+
+def float_clip(num_frames=5, height=24, width=32):
+    rng = np.random.default_rng(0)
+    return rng.random((num_frames, height, width, 3), dtype=np.float32)
+
+
+def test_to_uint8_array_converts_in_chunks():
+    frames = float_clip(num_frames=11)
+
+    converted = to_uint8_array(frames, chunk=4)
+
+    assert converted.shape == (11, 24, 32, 3)
+    assert converted.dtype == np.uint8 and converted.flags['C_CONTIGUOUS']
+    np.testing.assert_array_equal(converted, (frames * 255).round().astype(np.uint8))
+
+
+def test_to_uint8_array_accepts_frame_lists_and_keeps_uint8_buffers():
+    frames = list(float_clip(num_frames=3))
+    converted = to_uint8_array(frames)
+
+    assert converted.shape == (3, 24, 32, 3)
+    assert to_uint8_array(converted) is converted
+    assert to_uint8_array([]).shape == (0, 0, 0, 3)
+
+
+def test_interpolate_frames_resamples_to_target_fps():
+    frames = to_uint8_array(float_clip(num_frames=9))
+
+    # 8 intervals at 16 fps (0.5s) become 12 intervals at 24 fps
+    doubled = interpolate_frames(frames, 16, 24)
+
+    assert doubled.shape == (13, 24, 32, 3) and doubled.dtype == np.uint8
+    np.testing.assert_array_equal(doubled[0], frames[0])
+    np.testing.assert_array_equal(doubled[-1], frames[-1])
+    assert interpolate_frames(frames, 16, 16) is frames
+
+
+def test_upscale_frames_returns_requested_size():
+    upscaled = upscale_frames(float_clip(num_frames=2), (64, 48))
+
+    assert upscaled.shape == (2, 48, 64, 3) and upscaled.dtype == np.uint8